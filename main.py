@@ -3,7 +3,6 @@ from textual.widgets import Header, Footer, Static
 from textual.containers import Container
 from rich.text import Text
 from src.game_manager import GameMap
-from src.base import Position
 from src.log import get_logger
 from random import randint
 from pathlib import Path
@@ -44,16 +43,7 @@ class GameMapWidget(Static):
         
     def render(self) -> Text:
         """Render the game map with entities"""
-        lines = []
-        
-        for y in range(self.game_map.height):
-            line = ""
-            for x in range(self.game_map.width):
-                position = Position(x, y)
-                cell_render = self.game_map.render_cell(position)
-                line += cell_render
-            lines.append(line)
-        
+        lines = [self.game_map.render_row(y) for y in range(self.game_map.height)]
         return Text.from_markup("\n".join(lines))
     
     def move_player(self, direction: str) -> bool:
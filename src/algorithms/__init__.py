@@ -15,12 +15,15 @@ Usage:
     result = bot.solve(game_map, algorithm='astar')
 """
 
-from .sokoban_bot import SokobanBot, TIME_LIMIT_DEFAULT
+from .sokoban_bot import SokobanBot, AlgoSpec, ALGORITHMS, ALGORITHM_INFO, TIME_LIMIT_DEFAULT
 from .breadth_first_search import solve_with_bfs
 from .astar_search import solve_with_astar  
 
 __all__ = [
     'SokobanBot',
+    'AlgoSpec',
+    'ALGORITHMS',
+    'ALGORITHM_INFO',
     'TIME_LIMIT_DEFAULT',
     'solve_with_bfs',
     'solve_with_astar', 
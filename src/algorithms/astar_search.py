@@ -4,7 +4,8 @@ Optimized for memory usage and performance with time limits.
 """
 
 import heapq
-from typing import List, Tuple, Optional, Set, Dict
+from functools import lru_cache
+from typing import List, Tuple, Optional, Set, Dict, FrozenSet
 import copy
 import time
 from dataclasses import dataclass, field
@@ -13,12 +14,141 @@ from ..log.logger import get_logger
 
 log = get_logger(__name__)
 
+# Move directions, in expansion order
+_DIRECTIONS: Tuple[str, ...] = ('up', 'down', 'left', 'right')
+
+# One-byte move codes: a state's path is stored as bytes indexing _DIRECTIONS
+_MOVE_CODES: Tuple[bytes, ...] = tuple(bytes((code,)) for code in range(len(_DIRECTIONS)))
+
+# Step (dx, dy) per entry of _DIRECTIONS
+_STEPS: Tuple[Tuple[int, int], ...] = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+# Box layouts whose heuristic is kept per solver (player-only moves reuse the parent's)
+HEURISTIC_CACHE_SIZE = 65536
+
+# Distance-table entry for a cell from which a box can never be pushed onto that dock
+UNREACHABLE_COST = 999999
+
+# Per level layout: (dock order, dock distance rows, tunnel entries)
+_level_tables_cache: Dict[Tuple[str, ...], Tuple] = {}
+_LEVEL_TABLES_CACHE_SIZE = 16
+
+
+def _min_cost_matching(cost_rows: List[List[int]]) -> int:
+    """
+    Minimum total cost of assigning every row (box) to a distinct column (dock).
+    Hungarian algorithm with potentials, O(rows^2 * columns); needs rows <= columns.
+    """
+    rows = len(cost_rows)
+    columns = len(cost_rows[0])
+    inf = float('inf')
+    row_potential = [0] * (rows + 1)
+    column_potential = [0] * (columns + 1)
+    # owner[j]: 1-based row assigned to column j (column 0 is the augmenting root)
+    owner = [0] * (columns + 1)
+    previous = [0] * (columns + 1)
+
+    for row in range(1, rows + 1):
+        owner[0] = row
+        column = 0
+        slack = [inf] * (columns + 1)
+        used = [False] * (columns + 1)
+        while owner[column]:
+            used[column] = True
+            current_row = owner[column]
+            costs = cost_rows[current_row - 1]
+            offset = row_potential[current_row]
+            delta = inf
+            next_column = 0
+            for j in range(1, columns + 1):
+                if not used[j]:
+                    reduced = costs[j - 1] - offset - column_potential[j]
+                    if reduced < slack[j]:
+                        slack[j] = reduced
+                        previous[j] = column
+                    if slack[j] < delta:
+                        delta = slack[j]
+                        next_column = j
+            for j in range(columns + 1):
+                if used[j]:
+                    row_potential[owner[j]] += delta
+                    column_potential[j] -= delta
+                else:
+                    slack[j] -= delta
+            column = next_column
+        # Flip the augmenting path back to the root
+        while column:
+            owner[column] = owner[previous[column]]
+            column = previous[column]
+
+    return -column_potential[0]
+
+
+class _BucketQueue:
+    """
+    Priority queue of states with one LIFO bucket per (f_cost, -g_cost) key.
+    Costs are small ints with many states per value, so only the distinct keys
+    go through heapq (as int tuples, compared in C); states themselves are
+    appended and popped from lists without any comparisons.
+    """
+    
+    def __init__(self):
+        self._buckets: Dict[Tuple[int, int], List['AStarState']] = {}
+        self._keys: List[Tuple[int, int]] = []
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def push(self, state: 'AStarState'):
+        """Add a state under its (f_cost, -g_cost) key"""
+        key = (state.f_cost, -state.g_cost)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = [state]
+            heapq.heappush(self._keys, key)
+        else:
+            bucket.append(state)
+        self._size += 1
+    
+    def pop(self) -> 'AStarState':
+        """Remove and return a state with the lowest f_cost, preferring higher g_cost"""
+        key = self._keys[0]
+        bucket = self._buckets[key]
+        state = bucket.pop()
+        if not bucket:
+            heapq.heappop(self._keys)
+            del self._buckets[key]
+        self._size -= 1
+        return state
+    
+    def best_f(self) -> int:
+        """Lowest f_cost in the queue (0 if empty)"""
+        return self._keys[0][0] if self._keys else 0
+    
+    def trim(self, keep: int):
+        """Keep only the keep best states, dropping whole buckets from the worst end"""
+        keys = sorted(self._keys)  # A sorted list is already a heap
+        kept = 0
+        for index, key in enumerate(keys):
+            if kept >= keep:
+                for dropped in keys[index:]:
+                    del self._buckets[dropped]
+                del keys[index:]
+                break
+            bucket = self._buckets[key]
+            if kept + len(bucket) > keep:
+                del bucket[keep - kept:]
+            kept += len(bucket)
+        self._keys = keys
+        self._size = kept
+
 @dataclass
 class AStarState:
     """Optimized game state for A* pathfinding"""
     player_pos: Tuple[int, int]
     box_positions: Tuple[Tuple[int, int], ...]
-    moves: List[str]
+    moves: bytes  # Codes into _DIRECTIONS, decoded only for the solution
     g_cost: int = 0  # Cost from start
     h_cost: int = 0  # Heuristic cost to goal
     f_cost: int = field(init=False)  # Total cost
@@ -57,6 +187,20 @@ class AStarSearch:
         self.visited_states: Dict[Tuple, int] = {}  # state -> best g_cost
         self.solution_found = False
         self.dock_positions = self.get_dock_positions(initial_game_map)
+        layout = tuple(initial_game_map.original_level_data)
+        tables = _level_tables_cache.get(layout)
+        if tables is None:
+            dock_list = list(self.dock_positions)  # Fixed order for distance rows
+            self._dock_list: List[Tuple[int, int]] = dock_list
+            tables = (dock_list, self._build_dock_distance_rows(initial_game_map),
+                      self._find_tunnel_entries(initial_game_map))
+            if len(_level_tables_cache) >= _LEVEL_TABLES_CACHE_SIZE:
+                # Evict the oldest entry
+                del _level_tables_cache[next(iter(_level_tables_cache))]
+            _level_tables_cache[layout] = tables
+        # Read-only per-level tables, shared by every solver run on the same level
+        self._dock_list, self._dock_distance_rows, self._tunnel_entries = tables
+        self._cached_heuristic = lru_cache(maxsize=HEURISTIC_CACHE_SIZE)(self.calculate_heuristic)
         self.start_time = None
         self.iterations_used = 0  # Track actual iterations used
         
@@ -74,14 +218,47 @@ class AStarSearch:
         """Extract box positions from game map as sorted tuple"""
         return tuple(sorted(box.position.to_tuple() for box in game_map.boxes))
     
+    def _build_dock_distance_rows(self, game_map: GameMap) -> Dict[Tuple[int, int], List[int]]:
+        """
+        Push distance from every cell to every dock (in _dock_list order), found by
+        pulling a box back from each dock once so heuristics only do row lookups.
+        Unlike Manhattan distance this routes around walls and is still admissible.
+        """
+        per_dock = [game_map._pull_distances(dock) for dock in self._dock_list]
+        return {
+            (x, y): [distances.get((x, y), UNREACHABLE_COST) for distances in per_dock]
+            for y in range(game_map.height) for x in range(game_map.width)
+        }
+    
+    def _find_tunnel_entries(self, game_map: GameMap) -> List[FrozenSet[Tuple[int, int]]]:
+        """
+        Per direction code: player cells from which a push runs along a one-wide tunnel.
+        The player's cell and the cell ahead both have walls on either side across the
+        direction, and the cell ahead is not a dock, so the box can only go on forwards.
+        """
+        blocked = game_map._blocked_positions
+        docks = game_map._dock_positions
+        
+        def walled_in(x: int, y: int, dx: int, dy: int) -> bool:
+            return (x, y) not in blocked and (x + dy, y + dx) in blocked and (x - dy, y - dx) in blocked
+        
+        return [
+            frozenset(
+                (x, y) for y in range(game_map.height) for x in range(game_map.width)
+                if walled_in(x, y, dx, dy) and walled_in(x + dx, y + dy, dx, dy)
+                and (x + dx, y + dy) not in docks
+            )
+            for dx, dy in _STEPS
+        ]
+    
     def manhattan_distance(self, pos1: Tuple[int, int], pos2: Tuple[int, int]) -> int:
         """Calculate Manhattan distance between two positions"""
         return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
     
     def calculate_heuristic(self, box_positions: Tuple[Tuple[int, int], ...]) -> int:
         """
-        Enhanced heuristic calculation with dock reassignment optimization.
-        Considers moving boxes between docks for better overall positioning.
+        Minimum total push distance over all box-to-dock assignments.
+        Each dock takes at most one box, so shared nearest docks are not double-counted.
         """
         if not box_positions or not self.dock_positions:
             return 0
@@ -90,165 +267,26 @@ class AStarSearch:
         if set(box_positions) <= self.dock_positions:
             return 0
         
-        # Enhanced assignment that considers dock reassignment
         return self._calculate_optimal_assignment(box_positions)
     
     def _calculate_optimal_assignment(self, box_positions: Tuple[Tuple[int, int], ...]) -> int:
-        """
-        Calculate optimal box-to-dock assignment considering reassignment benefits.
-        Uses Hungarian-like algorithm with box swapping consideration.
-        """
-        if not box_positions:
-            return 0
-            
-        # Create distance matrix for all boxes to all docks
-        distance_matrix = []
-        for box_pos in box_positions:
-            box_distances = []
-            for dock_pos in self.dock_positions:
-                distance = self.manhattan_distance(box_pos, dock_pos)
-                box_distances.append(distance)
-            distance_matrix.append(box_distances)
-        
-        # Find optimal assignment using greedy approach with reassignment
-        dock_list = list(self.dock_positions)
-        num_boxes = len(box_positions)
-        num_docks = len(dock_list)
-        
-        if num_boxes > num_docks:
+        """Optimal box-to-dock assignment cost over the precomputed distance rows"""
+        if len(box_positions) > len(self._dock_list):
             # More boxes than docks - impossible to solve
             return 999999  # Large number instead of float('inf')
         
-        # Try to find the best assignment considering current dock usage
-        best_total_cost = self._greedy_assignment(distance_matrix, box_positions, dock_list)
-        
-        # Consider dock reassignment if it improves accessibility
-        reassignment_cost = self._consider_dock_reassignment(box_positions, dock_list)
-        
-        return min(best_total_cost, reassignment_cost)
-    
-    def _greedy_assignment(self, distance_matrix: List[List[int]], 
-                          box_positions: Tuple[Tuple[int, int], ...], 
-                          dock_list: List[Tuple[int, int]]) -> int:
-        """Standard greedy assignment algorithm"""
-        used_docks = set()
-        total_cost = 0
-        
-        # Sort boxes by their minimum distance to any available dock
-        box_indices = list(range(len(box_positions)))
-        box_indices.sort(key=lambda i: min(distance_matrix[i]))
-        
-        for box_idx in box_indices:
-            box_pos = box_positions[box_idx]
-            
-            # Skip boxes already on docks
-            if box_pos in self.dock_positions:
-                continue
-                
-            # Find best available dock
-            best_cost = 999999  # Large number instead of float('inf')
-            best_dock_idx = None
-            
-            for dock_idx, dock_pos in enumerate(dock_list):
-                if dock_pos not in used_docks:
-                    cost = distance_matrix[box_idx][dock_idx]
-                    if cost < best_cost:
-                        best_cost = cost
-                        best_dock_idx = dock_idx
-            
-            if best_dock_idx is not None:
-                total_cost += best_cost
-                used_docks.add(dock_list[best_dock_idx])
-        
-        return int(total_cost)
-    
-    def _consider_dock_reassignment(self, box_positions: Tuple[Tuple[int, int], ...], 
-                                   dock_list: List[Tuple[int, int]]) -> int:
-        """
-        Consider reassigning boxes between docks for better overall solution.
-        This is the key enhancement for your requirement!
-        """
-        # Identify boxes currently on docks
-        boxes_on_docks = [pos for pos in box_positions if pos in self.dock_positions]
-        boxes_not_on_docks = [pos for pos in box_positions if pos not in self.dock_positions]
-        
-        if not boxes_on_docks or not boxes_not_on_docks:
-            # No reassignment needed if all boxes are on/off docks
-            return self._greedy_assignment(
-                [[self.manhattan_distance(box, dock) for dock in dock_list] for box in box_positions],
-                box_positions, dock_list
-            )
-        
-        # Calculate cost of moving boxes that aren't on docks to free docks
-        free_docks = [dock for dock in dock_list if dock not in boxes_on_docks]
-        
-        if len(free_docks) >= len(boxes_not_on_docks):
-            # Enough free docks - no reassignment needed
-            return sum(min(self.manhattan_distance(box, dock) for dock in free_docks) 
-                      for box in boxes_not_on_docks)
-        
-        # Need to consider reassignment - try swapping boxes between docks
-        min_reassignment_cost = 999999  # Large number instead of float('inf')
-        
-        # Try reassigning each box currently on a dock
-        for current_box_on_dock in boxes_on_docks:
-            # Calculate cost to move this box to a different dock
-            reassignment_options = []
-            
-            for target_dock in dock_list:
-                if target_dock != current_box_on_dock:  # Different dock
-                    move_cost = self.manhattan_distance(current_box_on_dock, target_dock)
-                    
-                    # Calculate benefit: can a waiting box reach the freed dock easier?
-                    freed_dock = current_box_on_dock
-                    best_benefit = 0
-                    
-                    for waiting_box in boxes_not_on_docks:
-                        # Cost to move waiting box to freed dock
-                        to_freed_cost = self.manhattan_distance(waiting_box, freed_dock)
-                        
-                        # Compare with cost to move to best alternative dock
-                        alternative_docks = [dock for dock in dock_list if dock != freed_dock and dock not in boxes_on_docks]
-                        alternative_cost = min(
-                            self.manhattan_distance(waiting_box, dock) 
-                            for dock in alternative_docks
-                        ) if alternative_docks else 999999
-                        
-                        benefit = max(0, alternative_cost - to_freed_cost)
-                        best_benefit = max(best_benefit, benefit)
-                    
-                    # Net cost of reassignment
-                    net_cost = move_cost - best_benefit
-                    reassignment_options.append(net_cost)
-            
-            if reassignment_options:
-                min_reassignment_cost = min(min_reassignment_cost, min(reassignment_options))
-        
-        # Calculate total cost with reassignment
-        if min_reassignment_cost < 999999:
-            # Cost of reassignment + cost to place remaining boxes
-            remaining_cost = sum(
-                min(self.manhattan_distance(box, dock) for dock in dock_list)
-                for box in boxes_not_on_docks
-            )
-            return int(min_reassignment_cost + remaining_cost)
-        
-        # Fallback to greedy assignment
-        return self._greedy_assignment(
-            [[self.manhattan_distance(box, dock) for dock in dock_list] for box in box_positions],
-            box_positions, dock_list
-        )
+        return _min_cost_matching([self._dock_distance_rows[box_pos] for box_pos in box_positions])
     
-    def create_state(self, game_map: GameMap, moves: List[str], g_cost: int) -> AStarState:
+    def create_state(self, game_map: GameMap, moves: bytes, g_cost: int) -> AStarState:
         """Create an optimized A* state from current map"""
         player_pos = game_map.player.position.to_tuple() if game_map.player else (0, 0)
         box_positions = self.get_box_positions(game_map)
-        h_cost = self.calculate_heuristic(box_positions)
+        h_cost = self._cached_heuristic(box_positions)
         
         return AStarState(
             player_pos=player_pos,
             box_positions=box_positions,
-            moves=moves.copy(),
+            moves=moves,
             g_cost=g_cost,
             h_cost=h_cost
         )
@@ -256,28 +294,49 @@ class AStarSearch:
     def get_possible_moves(self, state: AStarState, game_map: GameMap) -> List[Tuple[str, AStarState]]:
         """Get all possible moves from current state with pruning"""
         possible_moves = []
-        directions = ['up', 'down', 'left', 'right']
         
-        for direction in directions:
-            # Create a copy of the game map to test the move
-            test_map = copy.deepcopy(game_map)
+        for code, direction in enumerate(_DIRECTIONS):
+            # _move_box replaces this set, so an unchanged object means no box was pushed
+            parent_boxes = game_map._box_positions_frozen
+            # Use move_player_bot for deadlock detection in algorithms.
+            # The move is applied to game_map in place and undone below.
+            if not game_map.move_player_bot(direction):
+                continue
             
-            # Use move_player_bot for deadlock detection in algorithms
-            if test_map.move_player_bot(direction):
-                # Check for global deadlock: all boxes stuck
-                if test_map._is_all_boxes_stuck():
-                    continue
-                
-                new_moves = state.moves + [direction]
-                new_g_cost = state.g_cost + 1
-                new_state = self.create_state(test_map, new_moves, new_g_cost)
+            new_moves = state.moves + _MOVE_CODES[code]
+            new_g_cost = state.g_cost + 1
+            if game_map._box_positions_frozen is parent_boxes:
+                # Player-only move: the parent's box key, heuristic and stuck check still hold
+                new_state = AStarState(
+                    player_pos=game_map.player.position.to_tuple(),
+                    box_positions=state.box_positions,
+                    moves=new_moves,
+                    g_cost=new_g_cost,
+                    h_cost=state.h_cost
+                )
+            else:
+                # Tunnel macro: a box pushed into a one-wide tunnel with the player behind it
+                # has nowhere to go but forwards, so keep pushing as a single expansion
+                tunnel = self._tunnel_entries[code]
+                while game_map.player.position.to_tuple() in tunnel and game_map.move_player_bot(direction):
+                    new_moves += _MOVE_CODES[code]
+                    new_g_cost += 1
                 
+                # Check for global deadlock: all boxes stuck
+                if game_map._is_all_boxes_stuck():
+                    new_state = None
+                else:
+                    new_state = self.create_state(game_map, new_moves, new_g_cost)
+            
+            if new_state is not None:
                 # Pruning: only add if we haven't visited or found a better path
                 state_key = (new_state.player_pos, new_state.box_positions)
                 if (state_key not in self.visited_states or 
                     self.visited_states[state_key] > new_g_cost):
                     self.visited_states[state_key] = new_g_cost
                     possible_moves.append((direction, new_state))
+            
+            game_map.restore_state(state.player_pos, state.box_positions)
         
         return possible_moves
     
@@ -289,15 +348,18 @@ class AStarSearch:
         self.start_time = time.time()
         
         # Initialize with starting state
-        initial_state = self.create_state(self.initial_map, [], 0)
-        priority_queue = [initial_state]
-        heapq.heapify(priority_queue)
+        initial_state = self.create_state(self.initial_map, b'', 0)
+        priority_queue = _BucketQueue()
+        priority_queue.push(initial_state)
         
         state_key = (initial_state.player_pos, initial_state.box_positions)
         self.visited_states[state_key] = 0
         
         iterations = 0
         
+        # One working map, reset to each popped state instead of copied and replayed
+        test_map = copy.copy(self.initial_map)
+        
         while priority_queue and iterations < self.max_iterations:
             if self.is_time_exceeded():
                 elapsed_time = time.time() - self.start_time
@@ -305,13 +367,11 @@ class AStarSearch:
                 self.iterations_used = iterations  # Store iterations before breaking
                 break
                 
-            current_state = heapq.heappop(priority_queue)
+            current_state = priority_queue.pop()
             iterations += 1
             
             # Reconstruct game map from state
-            test_map = copy.deepcopy(self.initial_map)
-            for move in current_state.moves:
-                test_map.move_player_bot(move)
+            test_map.restore_state(current_state.player_pos, current_state.box_positions)
             
             # Check if we've solved the puzzle
             if test_map.is_level_complete():
@@ -322,26 +382,26 @@ class AStarSearch:
                 log.info(f"⏰ Time taken: {elapsed_time:.2f}s")
                 self.solution_found = True
                 self.iterations_used = iterations  # Store iterations on success
-                return current_state.moves
+                return [_DIRECTIONS[code] for code in current_state.moves]
             
             # Explore all possible moves
             possible_moves = self.get_possible_moves(current_state, test_map)
             
             for direction, new_state in possible_moves:
-                heapq.heappush(priority_queue, new_state)
+                priority_queue.push(new_state)
             
             # Progress indicator with memory management
             if iterations % 3000 == 0:
                 elapsed_time = time.time() - self.start_time
-                best_f = priority_queue[0].f_cost if priority_queue else 0
-                log.debug(f"⏳ Explored {iterations} states, queue: {len(priority_queue)}, best f: {best_f}, time: {elapsed_time:.1f}s")
+                best_f = priority_queue.best_f()
+                log.debug("⏳ Explored {} states, queue: {}, best f: {}, time: {:.1f}s",
+                          iterations, len(priority_queue), best_f, elapsed_time)
                 
                 # Memory management: limit queue size
                 if len(priority_queue) > 150000:
                     log.info("🧹 Trimming queue to manage memory...")
-                    priority_queue.sort()
-                    priority_queue = priority_queue[:75000]
-                    heapq.heapify(priority_queue)
+                    # Keep the best states
+                    priority_queue.trim(75000)
         
         elapsed_time = time.time() - self.start_time if self.start_time else 0
         log.warning(f"❌ No solution found after {iterations} iterations in {elapsed_time:.2f}s")
@@ -0,0 +1,226 @@
+"""
+Bitboard representation of a Sokoban map for the search algorithms.
+
+The static layout (walls, docks) is flattened once into integer bitmasks,
+and a search state becomes one plain int: a mask with one bit set per box,
+shifted left past the player's cell index in the low bits. Move generation,
+goal tests and deadlock checks are then bit operations instead of
+Position/entity lookups, and states hash as cheaply as any small int.
+"""
+
+from itertools import combinations
+from typing import List, Optional, Tuple
+from ..game_manager import GameMap
+
+# A search state: (box occupancy mask << Bitboard.player_bits) | player cell index
+State = int
+
+
+class Bitboard:
+    """Flattened, integer-mask view of a GameMap's static layout"""
+
+    def __init__(self, game_map: GameMap):
+        self.width = game_map.width
+        self.height = game_map.height
+        width = self.width
+
+        # GameMap already keeps the static cells as position sets
+        walls_mask = 0
+        for x, y in game_map._wall_positions:
+            walls_mask |= 1 << (y * width + x)
+        docks_mask = 0
+        for x, y in game_map._dock_positions:
+            docks_mask |= 1 << (y * width + x)
+        self.walls_mask = walls_mask
+        self.docks_mask = docks_mask
+
+        # Low bits of a state hold the player's cell index
+        self.player_bits = (width * self.height).bit_length()
+        self.player_mask = (1 << self.player_bits) - 1
+
+        # Static dead squares (precomputed by GameMap): cells from which a box can
+        # never reach a dock, so pushing one there can never lead to a solution
+        dead_mask = 0
+        for x, y in game_map._dead_positions:
+            dead_mask |= 1 << (y * width + x)
+        self.dead_mask = dead_mask
+
+        # Per direction: (name, index delta, mask of cells the step stays in bounds from)
+        self.directions: List[Tuple[str, int, int]] = []
+        for name, dx, dy in (('up', 0, -1), ('down', 0, 1), ('left', -1, 0), ('right', 1, 0)):
+            in_bounds_mask = 0
+            for y in range(self.height):
+                for x in range(width):
+                    if 0 <= x + dx < width and 0 <= y + dy < self.height:
+                        in_bounds_mask |= 1 << (y * width + x)
+            self.directions.append((name, dy * width + dx, in_bounds_mask))
+
+        # Backward (pull) steps: (forward direction that undoes the step, delta,
+        # in-bounds mask for the step, in-bounds mask for the cell behind the player)
+        in_bounds = {name: mask for name, _, mask in self.directions}
+        opposite = {'up': 'down', 'down': 'up', 'left': 'right', 'right': 'left'}
+        self.pull_directions: List[Tuple[str, int, int, int]] = [
+            (opposite[name], delta, mask, in_bounds[opposite[name]])
+            for name, delta, mask in self.directions
+        ]
+
+        # Per axis: (index stride, cells with a neighbour on both sides along it)
+        self.board_mask = (1 << (width * self.height)) - 1
+        self.axes: List[Tuple[int, int]] = [
+            (1, in_bounds['left'] & in_bounds['right']),
+            (width, in_bounds['up'] & in_bounds['down']),
+        ]
+
+        # Push distance from every cell to its nearest dock, routed around walls
+        # (lower bound on pushes); dead cells never hold a box during search
+        per_dock = [game_map._pull_distances(dock) for dock in self.cells(docks_mask)]
+        self.dock_distance: List[int] = [
+            min((distances[(x, y)] for distances in per_dock if (x, y) in distances), default=0)
+            for y in range(self.height) for x in range(width)
+        ]
+
+    def index(self, x: int, y: int) -> int:
+        """Cell index of an (x, y) coordinate"""
+        return y * self.width + x
+
+    def position(self, index: int) -> Tuple[int, int]:
+        """(x, y) coordinate of a cell index"""
+        y, x = divmod(index, self.width)
+        return (x, y)
+
+    def cells(self, mask: int) -> List[Tuple[int, int]]:
+        """(x, y) coordinates of every set bit in mask"""
+        cells = []
+        while mask:
+            low_bit = mask & -mask
+            cells.append(self.position(low_bit.bit_length() - 1))
+            mask ^= low_bit
+        return cells
+
+    def pack(self, player: int, boxes: int) -> State:
+        """Build a state from a player cell index and a box mask"""
+        return (boxes << self.player_bits) | player
+
+    def player_of(self, state: State) -> int:
+        """Player cell index of a state"""
+        return state & self.player_mask
+
+    def boxes_of(self, state: State) -> int:
+        """Box mask of a state"""
+        return state >> self.player_bits
+
+    def encode(self, game_map: GameMap) -> State:
+        """Encode the dynamic part of a GameMap as a state"""
+        player = self.index(*game_map.player.position.to_tuple()) if game_map.player else 0
+        boxes_mask = 0
+        for box in game_map.boxes:
+            boxes_mask |= 1 << self.index(box.x, box.y)
+        return self.pack(player, boxes_mask)
+
+    def move(self, state: State, delta: int, in_bounds_mask: int) -> Optional[State]:
+        """
+        Apply one bot move (same rules as GameMap.move_player_bot).
+        Returns the new state, or None if the move is illegal or pushes
+        a box onto a dead square.
+        """
+        player_bits = self.player_bits
+        player = state & self.player_mask
+        if not (in_bounds_mask >> player) & 1:
+            return None
+        target = player + delta
+        if (self.walls_mask >> target) & 1:
+            return None
+
+        boxes = state >> player_bits
+        if (boxes >> target) & 1:
+            if not (in_bounds_mask >> target) & 1:
+                return None
+            beyond = target + delta
+            if ((self.walls_mask | boxes | self.dead_mask) >> beyond) & 1:
+                return None
+            boxes ^= (1 << target) | (1 << beyond)
+            return (boxes << player_bits) | target
+
+        # Only the player index changes
+        return state + delta
+
+    def pulls(self, state: State) -> List[Tuple[str, State]]:
+        """
+        Predecessor states of a state, for searching backwards from the goal.
+        Each entry is (forward direction, previous state): making that move
+        from the previous state leads back to the given state.
+        """
+        player = state & self.player_mask
+        boxes = state >> self.player_bits
+        blocked = self.walls_mask | boxes
+        predecessors = []
+        for forward_direction, delta, in_bounds_mask, behind_mask in self.pull_directions:
+            if not (in_bounds_mask >> player) & 1:
+                continue
+            target = player + delta
+            if (blocked >> target) & 1:
+                continue
+            # Plain step back, no box involved
+            predecessors.append((forward_direction, state + delta))
+            # Pull the box behind the player onto the player's cell
+            if (behind_mask >> player) & 1:
+                behind = player - delta
+                if (boxes >> behind) & 1 and not (self.dead_mask >> player) & 1:
+                    pulled = boxes ^ ((1 << behind) | (1 << player))
+                    predecessors.append((forward_direction, self.pack(target, pulled)))
+        return predecessors
+
+    def goal_states(self, box_count: int, limit: int = 10000) -> Optional[List[State]]:
+        """
+        Every solved state: boxes on box_count docks, player next to a box.
+        Returns None if there would be more than limit of them.
+        """
+        docks = [self.index(x, y) for x, y in self.cells(self.docks_mask)]
+        goals: List[State] = []
+        for chosen in combinations(docks, box_count):
+            boxes = 0
+            for dock in chosen:
+                boxes |= 1 << dock
+            blocked = self.walls_mask | boxes
+            players = 0
+            for dock in chosen:
+                for _, delta, in_bounds_mask in self.directions:
+                    if (in_bounds_mask >> dock) & 1 and not (blocked >> (dock + delta)) & 1:
+                        players |= 1 << (dock + delta)
+            while players:
+                low_bit = players & -players
+                goals.append(self.pack(low_bit.bit_length() - 1, boxes))
+                players ^= low_bit
+            if len(goals) > limit:
+                return None
+        return goals
+
+    def is_all_boxes_stuck(self, state: State) -> bool:
+        """
+        Same check as GameMap._is_all_boxes_stuck, as whole-board mask arithmetic:
+        a box can still move along an axis if the cells on both sides are free.
+        The player's own cell is always free, so the player needs no special case.
+        """
+        boxes = state >> self.player_bits
+        if boxes & self.docks_mask:
+            return False
+        free = self.board_mask & ~(self.walls_mask | boxes)
+        for stride, both_sides_mask in self.axes:
+            if boxes & both_sides_mask & (free << stride) & (free >> stride):
+                return False
+        return True
+
+    def heuristic(self, state: State) -> int:
+        """Admissible estimate of the moves left: each box's distance to its nearest dock"""
+        dock_distance = self.dock_distance
+        boxes = state >> self.player_bits
+        total = 0
+        while boxes:
+            low_bit = boxes & -boxes
+            total += dock_distance[low_bit.bit_length() - 1]
+            boxes ^= low_bit
+        return total
+
+    def is_complete(self, state: State) -> bool:
+        """All boxes are on docks"""
+        return not (state >> self.player_bits) & ~self.docks_mask
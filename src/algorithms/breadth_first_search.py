@@ -3,320 +3,441 @@ Breadth-First Search Algorithm for Sokoban
 Optimized for memory usage and performance with time limits.
 """
 
-from collections import deque
-from typing import List, Tuple, Optional, Set
-import copy
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Optional
 import time
-from dataclasses import dataclass
 from ..game_manager import GameMap
-from ..base import Position
 from ..log.logger import get_logger
+from .bitboard import Bitboard, State
 
 # Get logger for this module
 log = get_logger(__name__)
 
+# Frontiers smaller than this are expanded in-process; pickling costs more than it saves
+PARALLEL_MIN_FRONTIER = 4096
 
-@dataclass(frozen=True)
-class GameStateKey:
-    """Lightweight state representation for hashing and comparison"""
-    player_pos: Tuple[int, int]
-    box_positions: Tuple[Tuple[int, int], ...]
-    
-    @classmethod
-    def from_game_map(cls, game_map: GameMap):
-        box_positions = tuple(sorted(box.position.to_tuple() for box in game_map.boxes))
-        player_pos = game_map.player.position.to_tuple() if game_map.player else (0, 0)
-        return cls(
-            player_pos=player_pos,
-            box_positions=box_positions
-        )
+# Frontier size at which BFS hands over to IDA*, which keeps no frontier lists
+MEMORY_FRONTIER_LIMIT = 200000
+
+# Board used by frontier-expansion worker processes
+_worker_board: Optional[Bitboard] = None
+
+
+def _init_worker(board: Bitboard):
+    """Process pool initializer: keep one copy of the board per worker"""
+    global _worker_board
+    _worker_board = board
+
+
+def _expand_states(offset: int, states: List[State]) -> List[Tuple[int, str, State, bool]]:
+    """
+    Expand a chunk of a BFS frontier in a worker process.
+    Returns (frontier index, direction, child state, all boxes stuck) per legal move.
+    """
+    board = _worker_board
+    children = []
+    for index, state in enumerate(states, offset):
+        for direction, delta, in_bounds_mask in board.directions:
+            new_state = board.move(state, delta, in_bounds_mask)
+            if new_state is not None:
+                children.append((index, direction, new_state, board.is_all_boxes_stuck(new_state)))
+    return children
 
 
 class BreadthFirstSearch:
     """
     Optimized Breadth-First Search solver for Sokoban puzzles.
     Guarantees to find the shortest solution in terms of moves.
+    
+    States are single ints packing the box mask and player index (see Bitboard), so
+    expanding a node never copies or mutates a GameMap.
+    
+    With bidirectional=True the search also runs backwards (pulling boxes)
+    from every solved state and stops where the two frontiers meet. This
+    explores far fewer states on deep levels and the solution is still the
+    shortest: each side expands whole layers and a meeting is checked as each
+    state is inserted, so the first meeting is no longer than any other path.
+    
+    The forward search is level-synchronous; with workers > 1 large frontiers
+    are expanded in parallel by a process pool and merged in order. If the
+    frontier outgrows MEMORY_FRONTIER_LIMIT the search continues as IDA*,
+    which keeps the shortest-solution guarantee. That saves the frontier lists
+    and parent links only: its transposition table still holds one int per
+    expanded state, so it grows about as large as the visited set.
     """
     
-    def __init__(self, initial_game_map: GameMap, max_iterations: int = 50000, time_limit: float = 60.0):
+    def __init__(self, initial_game_map: GameMap, max_iterations: int = 50000, time_limit: float = 60.0,
+                 bidirectional: bool = False, workers: int = 1):
         self.initial_map = initial_game_map
         self.max_iterations = max_iterations
         self.time_limit = time_limit
-        self.visited_states: Set[GameStateKey] = set()
+        self.bidirectional = bidirectional
+        self.workers = workers
+        self.board = Bitboard(initial_game_map)
+        # Visited state -> (parent state, move from parent), None for the start
+        self.predecessors: Dict[State, Optional[Tuple[State, str]]] = {}
+        # IDA* fallback transposition table; predecessors is cleared when it starts
+        self.ida_table: Dict[State, int] = {}
         self.solution_found = False
         self.start_time = None
+        self._deadline = None
         self.iterations_used = 0  # Track actual iterations used
         
+    def _start_clock(self):
+        """Record the start time and the monotonic deadline derived from time_limit"""
+        self.start_time = time.monotonic()
+        self._deadline = self.start_time + self.time_limit
+    
     def is_time_exceeded(self) -> bool:
         """Check if time limit has been exceeded"""
-        if self.start_time is None:
+        if self._deadline is None:
             return False
-        return time.time() - self.start_time > self.time_limit
+        return time.monotonic() > self._deadline
     
-    def get_possible_moves(self, game_map: GameMap, current_moves: List[str]) -> List[Tuple[str, GameMap, List[str]]]:
-        """Get all possible moves from current state with enhanced dock reassignment logic"""
+    def get_possible_moves(self, state: State) -> List[Tuple[str, State]]:
+        """Get all possible moves from current state, pruning deadlocked states"""
         possible_moves = []
-        directions = ['up', 'down', 'left', 'right']
-        
-        for direction in directions:
-            # Create a shallow copy and test the move
-            test_map = copy.deepcopy(game_map)
+        board = self.board
+        predecessors = self.predecessors
+        
+        for direction, delta, in_bounds_mask in board.directions:
+            # Bot move rules, including corner deadlock detection
+            new_state = board.move(state, delta, in_bounds_mask)
+            if new_state is None:
+                continue
             
-            # Use move_player_bot for deadlock detection in algorithms
-            if test_map.move_player_bot(direction):
-                # Check for global deadlock: all boxes stuck
-                if test_map._is_all_boxes_stuck():
-                    continue
-                
-                # Check if this move involves dock reassignment and evaluate if it's beneficial
-                if self._is_beneficial_move(game_map, test_map, direction):
-                    state_key = GameStateKey.from_game_map(test_map)
-                    
-                    # Only add if we haven't visited this state before
-                    if state_key not in self.visited_states:
-                        new_moves = current_moves + [direction]
-                        possible_moves.append((direction, test_map, new_moves))
-                        self.visited_states.add(state_key)
+            # Skip already-seen states before running the deadlock check
+            if new_state in predecessors:
+                continue
+            predecessors[new_state] = (state, direction)
+            
+            # Check for global deadlock: all boxes stuck
+            if board.is_all_boxes_stuck(new_state):
+                continue
+            
+            possible_moves.append((direction, new_state))
         
         return possible_moves
     
-    def _is_beneficial_move(self, old_map: GameMap, new_map: GameMap, direction: str) -> bool:
-        """
-        Enhanced move evaluation that considers dock reassignment benefits.
-        This implements your requirement for smarter box movement between docks.
-        """
-        # Always allow moves that don't involve pushing boxes
-        if not old_map.player or not new_map.player:
-            return True
-            
-        old_player_pos = old_map.player.position
-        new_player_pos = new_map.player.position
-        
-        # Calculate direction offset
-        offsets = {'up': (0, -1), 'down': (0, 1), 'left': (-1, 0), 'right': (1, 0)}
-        dx, dy = offsets[direction]
-        pushed_box_pos = (old_player_pos.x + dx, old_player_pos.y + dy)
-        
-        # Check if we pushed a box
-        old_box_at_push_pos = None
-        for box in old_map.boxes:
-            if box.position.to_tuple() == pushed_box_pos:
-                old_box_at_push_pos = box
-                break
-        
-        if not old_box_at_push_pos:
-            # No box was pushed - always allow
-            return True
-        
-        # A box was pushed - analyze if it's beneficial
-        was_on_dock = old_box_at_push_pos.on_dock
-        
-        # Find the corresponding box in new map
-        new_box_pos = (pushed_box_pos[0] + dx, pushed_box_pos[1] + dy)
-        new_box_on_dock = False
-        for box in new_map.boxes:
-            if box.position.to_tuple() == new_box_pos:
-                new_box_on_dock = box.on_dock
-                break
-        
-        # Case 1: Box moved from non-dock to dock - always beneficial
-        if not was_on_dock and new_box_on_dock:
-            return True
-        
-        # Case 2: Box moved from dock to non-dock - evaluate if this helps other boxes
-        if was_on_dock and not new_box_on_dock:
-            return self._evaluate_dock_vacation_benefit(old_map, new_map, pushed_box_pos)
-        
-        # Case 3: Box moved from dock to dock - evaluate relative positioning
-        if was_on_dock and new_box_on_dock:
-            return self._evaluate_dock_to_dock_benefit(old_map, new_map, pushed_box_pos, new_box_pos)
-        
-        # Case 4: Box moved from non-dock to non-dock - always allow (standard move)
-        return True
+    @staticmethod
+    def _reconstruct_path(state: State, parents: Dict[State, Optional[Tuple[State, str]]]) -> List[str]:
+        """Follow parent links from state back to the root and return the moves in order"""
+        moves = []
+        link = parents[state]
+        while link is not None:
+            state, direction = link
+            moves.append(direction)
+            link = parents[state]
+        moves.reverse()
+        return moves
     
-    def _evaluate_dock_vacation_benefit(self, old_map: GameMap, new_map: GameMap, vacated_dock_pos: Tuple[int, int]) -> bool:
+    def solve(self) -> Optional[List[str]]:
         """
-        Evaluate if moving a box off a dock creates opportunities for other boxes.
-        This is a key part of the dock reassignment strategy.
+        Solve the Sokoban puzzle using optimized BFS.
+        Returns the sequence of moves to solve the puzzle, or None if no solution found.
         """
-        # Find boxes that are not on docks
-        boxes_needing_docks = []
-        for box in new_map.boxes:
-            if not box.on_dock:
-                boxes_needing_docks.append(box.position.to_tuple())
-        
-        if not boxes_needing_docks:
-            # No boxes need docks - vacating might not be beneficial
-            return False
+        if self.bidirectional:
+            return self.solve_bidirectional()
         
-        # Calculate if any waiting box is closer to the vacated dock than their current best option
-        vacated_dock = Position(vacated_dock_pos[0], vacated_dock_pos[1])
-        
-        dock_positions = {dock.position.to_tuple() for dock in new_map.docks}
-        occupied_docks = {box.position.to_tuple() for box in new_map.boxes if box.on_dock}
-        free_docks = dock_positions - occupied_docks
+        log.info("🔍 Starting Breadth-First Search...")
+        self._start_clock()
         
-        for waiting_box_pos in boxes_needing_docks:
-            waiting_box = Position(waiting_box_pos[0], waiting_box_pos[1])
-            
-            # Distance to vacated dock
-            distance_to_vacated = abs(waiting_box.x - vacated_dock.x) + abs(waiting_box.y - vacated_dock.y)
-            
-            # Distance to best alternative free dock
-            min_alternative_distance = float('inf')
-            for free_dock_pos in free_docks:
-                if free_dock_pos != vacated_dock_pos:  # Exclude the vacated dock
-                    free_dock = Position(free_dock_pos[0], free_dock_pos[1])
-                    distance = abs(waiting_box.x - free_dock.x) + abs(waiting_box.y - free_dock.y)
-                    min_alternative_distance = min(min_alternative_distance, distance)
-            
-            # If vacated dock is significantly closer, the move is beneficial
-            if distance_to_vacated < min_alternative_distance - 1:  # At least 2 steps closer
-                return True
+        # Initialize with starting state
+        initial_state = self.board.encode(self.initial_map)
+        frontier = [initial_state]
+        self.predecessors[initial_state] = None
         
-        # Also consider if vacating improves overall accessibility
-        return self._improves_accessibility(old_map, new_map, vacated_dock_pos)
+        iterations = 0
+        depth = 0
+        executor = None
+        if self.workers > 1:
+            executor = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.board,))
+        
+        try:
+            # Level-synchronous BFS: walk the current level list, fill the next one, swap
+            while frontier:
+                next_frontier = []
+                parallel = executor is not None and len(frontier) >= PARALLEL_MIN_FRONTIER
+                stopped = False
+                for current_state in frontier:
+                    if iterations >= self.max_iterations:
+                        stopped = True
+                        break
+                    # Reading the clock every iteration is measurable at millions of states
+                    if (iterations & 1023) == 0 and self.is_time_exceeded():
+                        log.warning(f"⏰ Time limit of {self.time_limit}s exceeded after {iterations} iterations")
+                        stopped = True
+                        break
+                    iterations += 1
+                    
+                    # Check if we've solved the puzzle
+                    if self.board.is_complete(current_state):
+                        current_moves = self._reconstruct_path(current_state, self.predecessors)
+                        elapsed_time = time.monotonic() - self.start_time
+                        log.success(f"✅ Solution found in {iterations} iterations!")
+                        log.info(f"📏 Solution length: {len(current_moves)} moves")
+                        log.info(f"⏰ Time taken: {elapsed_time:.2f}s")
+                        self.solution_found = True
+                        self.iterations_used = iterations  # Store iterations on success
+                        return current_moves
+                    
+                    # Explore all possible moves (the parallel path expands the whole level below)
+                    if not parallel:
+                        for direction, new_state in self.get_possible_moves(current_state):
+                            next_frontier.append(new_state)
+                    
+                    # Progress indicator
+                    if iterations % 5000 == 0:
+                        elapsed_time = time.monotonic() - self.start_time
+                        log.debug("⏳ Explored {} states, frontier: {}, time: {:.1f}s",
+                                  iterations, len(frontier), elapsed_time)
+                
+                if stopped:
+                    # Stopped early on the iteration or time limit
+                    break
+                
+                if parallel:
+                    next_frontier = self._expand_parallel(executor, frontier)
+                frontier = next_frontier
+                depth += 1
+                
+                # Memory management: continue depth-first instead of growing the frontier
+                if len(frontier) > MEMORY_FRONTIER_LIMIT:
+                    log.debug(f"🧹 Frontier reached {len(frontier)} states, switching to IDA* from depth {depth}")
+                    self.predecessors.clear()
+                    return self._solve_ida_star(initial_state, depth, iterations)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        
+        self.iterations_used = iterations
+        elapsed_time = time.monotonic() - self.start_time if self.start_time else 0
+        log.warning(f"❌ No solution found after {iterations} iterations in {elapsed_time:.2f}s")
+        return None
     
-    def _evaluate_dock_to_dock_benefit(self, old_map: GameMap, new_map: GameMap, 
-                                     old_dock_pos: Tuple[int, int], new_dock_pos: Tuple[int, int]) -> bool:
+    def _solve_ida_star(self, initial_state: State, min_depth: int, iterations: int) -> Optional[List[str]]:
         """
-        Evaluate if moving a box from one dock to another improves the overall situation.
+        Iterative-deepening A* with a transposition table kept across bounds.
+        BFS has already ruled out every solution shorter than min_depth, so the
+        first bound starts there. Continues the iteration count and limits of solve().
         """
-        # Check if the new dock position provides better access for the player
-        # or creates better positioning for remaining boxes
-        
-        # Find boxes that still need to be moved
-        boxes_needing_docks = [box.position.to_tuple() for box in new_map.boxes if not box.on_dock]
-        
-        if not boxes_needing_docks:
-            # All boxes are on docks - this move might be unnecessary unless it improves access
-            return new_map.player is not None and len(new_map.get_entities_at(new_map.player.position)) > 1  # Allow if player movement is restricted
-        
-        # Calculate if the freed dock (old position) is more accessible to waiting boxes
-        old_dock = Position(old_dock_pos[0], old_dock_pos[1])
-        
-        for waiting_box_pos in boxes_needing_docks:
-            waiting_box = Position(waiting_box_pos[0], waiting_box_pos[1])
-            distance_to_freed_dock = abs(waiting_box.x - old_dock.x) + abs(waiting_box.y - old_dock.y)
-            
-            # Find distance to other available docks
-            dock_positions = {dock.position.to_tuple() for dock in new_map.docks}
-            occupied_docks = {box.position.to_tuple() for box in new_map.boxes if box.on_dock}
-            available_docks = dock_positions - occupied_docks
-            
-            min_other_distance = float('inf')
-            for available_dock_pos in available_docks:
-                if available_dock_pos != old_dock_pos:
-                    available_dock = Position(available_dock_pos[0], available_dock_pos[1])
-                    distance = abs(waiting_box.x - available_dock.x) + abs(waiting_box.y - available_dock.y)
-                    min_other_distance = min(min_other_distance, distance)
+        board = self.board
+        directions = board.directions
+        direction_count = len(directions)
+        heuristic = board.heuristic
+        
+        # state -> (g << 20) | pass that last expanded it. A state is only
+        # expanded again on a shorter path, or once per pass at its best depth,
+        # so later bounds do not re-walk the dominated paths of earlier ones.
+        best_g = self.ida_table
+        best_g[initial_state] = 0
+        pass_index = 0
+        bound = max(min_depth, heuristic(initial_state))
+        while True:
+            # Depth-first pass up to bound with an explicit stack, so deep
+            # solutions cannot hit the recursion limit. One frame per state on
+            # the current path: [state, g, index of the next direction to try];
+            # path holds the moves between consecutive frames.
+            pass_index += 1
+            stack = [[initial_state, 0, 0]]
+            path: List[str] = []
+            next_bound = float('inf')
+            solved = aborted = False
+            while stack:
+                frame = stack[-1]
+                state, g, index = frame
+                if index == direction_count:
+                    stack.pop()
+                    if path:
+                        path.pop()
+                    continue
+                frame[2] = index + 1
+                
+                direction, delta, in_bounds_mask = directions[index]
+                new_state = board.move(state, delta, in_bounds_mask)
+                if new_state is None:
+                    continue
+                entry = best_g.get(new_state)
+                if entry is not None and (entry >> 20 < g + 1 or entry == ((g + 1) << 20) | pass_index):
+                    continue
+                if board.is_all_boxes_stuck(new_state):
+                    continue
+                
+                iterations += 1
+                if iterations >= self.max_iterations or ((iterations & 1023) == 0 and self.is_time_exceeded()):
+                    aborted = True
+                    break
+                
+                f = g + 1 + heuristic(new_state)
+                if f > bound:
+                    next_bound = min(next_bound, f)
+                    continue
+                path.append(direction)
+                if board.is_complete(new_state):
+                    solved = True
+                    break
+                best_g[new_state] = ((g + 1) << 20) | pass_index
+                stack.append([new_state, g + 1, 0])
             
-            # If freed dock is notably closer, the reassignment is beneficial
-            if distance_to_freed_dock < min_other_distance - 1:
-                return True
+            if aborted:
+                break
+            if solved:
+                elapsed_time = time.monotonic() - self.start_time
+                log.success(f"✅ Solution found in {iterations} iterations!")
+                log.info(f"📏 Solution length: {len(path)} moves")
+                log.info(f"⏰ Time taken: {elapsed_time:.2f}s")
+                self.solution_found = True
+                self.iterations_used = iterations
+                return path
+            if next_bound == float('inf'):
+                break
+            log.debug("⏳ IDA* bound {} exhausted after {} iterations", bound, iterations)
+            bound = next_bound
         
-        return False
+        self.iterations_used = iterations
+        elapsed_time = time.monotonic() - self.start_time
+        log.warning(f"❌ No solution found after {iterations} iterations in {elapsed_time:.2f}s")
+        return None
     
-    def _improves_accessibility(self, old_map: GameMap, new_map: GameMap, vacated_dock_pos: Tuple[int, int]) -> bool:
+    def _expand_parallel(self, executor: ProcessPoolExecutor, states: List[State]) -> List[State]:
         """
-        Check if vacating a dock improves overall map accessibility.
+        Expand a frontier across the worker pool, then dedupe and filter the
+        children serially in frontier order (same result as the serial loop).
         """
-        # Simple heuristic: check if the vacated position was blocking access paths
-        vacated_pos = Position(vacated_dock_pos[0], vacated_dock_pos[1])
-        
-        # Count how many boxes can potentially access the vacated area more easily
-        accessibility_improvement = 0
-        
-        for box in new_map.boxes:
-            if not box.on_dock:
-                # Check if this box has better access to dock areas now
-                old_min_dock_distance = self._min_distance_to_accessible_dock(box.position, old_map)
-                new_min_dock_distance = self._min_distance_to_accessible_dock(box.position, new_map)
-                
-                if new_min_dock_distance < old_min_dock_distance:
-                    accessibility_improvement += 1
-        
-        return accessibility_improvement > 0
-    
-    def _min_distance_to_accessible_dock(self, box_position: Position, game_map: GameMap) -> int:
-        """Calculate minimum distance to an accessible dock."""
-        min_distance = float('inf')
-        
-        dock_positions = {dock.position.to_tuple() for dock in game_map.docks}
-        occupied_docks = {box.position.to_tuple() for box in game_map.boxes if box.on_dock}
-        free_docks = dock_positions - occupied_docks
-        
-        for dock_pos in free_docks:
-            distance = abs(box_position.x - dock_pos[0]) + abs(box_position.y - dock_pos[1])
-            min_distance = min(min_distance, distance)
-        
-        return int(min_distance) if min_distance != float('inf') else 999
+        chunk_size = -(-len(states) // (self.workers * 4))
+        futures = [
+            executor.submit(_expand_states, start, states[start:start + chunk_size])
+            for start in range(0, len(states), chunk_size)
+        ]
+        
+        predecessors = self.predecessors
+        next_frontier = []
+        for future in futures:
+            for index, direction, new_state, stuck in future.result():
+                if new_state in predecessors:
+                    continue
+                predecessors[new_state] = (states[index], direction)
+                if not stuck:
+                    next_frontier.append(new_state)
+        return next_frontier
     
-    def solve(self) -> Optional[List[str]]:
+    def solve_bidirectional(self) -> Optional[List[str]]:
         """
-        Solve the Sokoban puzzle using optimized BFS.
-        Returns the sequence of moves to solve the puzzle, or None if no solution found.
+        Meet-in-the-middle BFS: expand the smaller of the forward and backward
+        frontiers one full layer at a time until a state is reached from both.
+        Falls back to the one-directional search if there are too many goal states.
         """
-        log.info("🔍 Starting Breadth-First Search...")
-        self.start_time = time.time()
-        
-        # Initialize with starting state
-        initial_state_key = GameStateKey.from_game_map(self.initial_map)
-        queue = deque([(self.initial_map, [])])
-        self.visited_states.add(initial_state_key)
-        
+        board = self.board
+        initial_state = board.encode(self.initial_map)
+        box_count = bin(board.boxes_of(initial_state)).count('1')
+        if box_count > bin(board.docks_mask).count('1'):
+            log.warning("❌ More boxes than docks, level cannot be solved")
+            return None
+        goal_states = board.goal_states(box_count)
+        if goal_states is None:
+            log.warning("⚠️ Too many goal states for bidirectional search, using forward BFS")
+            self.bidirectional = False
+            return self.solve()
+        
+        log.info(f"🔍 Starting bidirectional Breadth-First Search ({len(goal_states)} goal states)...")
+        self._start_clock()
+        
+        if board.is_complete(initial_state):
+            self.solution_found = True
+            return []
+        
+        # state -> (neighbouring state towards the start / goal, forward move between them)
+        forward_parents = self.predecessors
+        forward_parents[initial_state] = None
+        backward_parents: Dict[State, Optional[Tuple[State, str]]] = {goal: None for goal in goal_states}
+        forward_frontier = [initial_state]
+        backward_frontier = list(goal_states)
         iterations = 0
+        meeting_state = None
+        stopped = False
         
-        while queue and iterations < self.max_iterations:
-            if self.is_time_exceeded():
+        def limit_reached() -> bool:
+            """Same per-state iteration and time limits as the forward search"""
+            if iterations >= self.max_iterations:
+                return True
+            # Reading the clock every iteration is measurable at millions of states
+            if (iterations & 1023) == 0 and self.is_time_exceeded():
                 log.warning(f"⏰ Time limit of {self.time_limit}s exceeded after {iterations} iterations")
-                self.iterations_used = iterations  # Store iterations before breaking
-                break
-                
-            current_map, current_moves = queue.popleft()
-            iterations += 1
-            
-            # Check if we've solved the puzzle
-            if current_map.is_level_complete():
-                elapsed_time = time.time() - self.start_time
-                log.success(f"✅ Solution found in {iterations} iterations!")
-                log.info(f"📏 Solution length: {len(current_moves)} moves")
-                log.info(f"⏰ Time taken: {elapsed_time:.2f}s")
-                self.solution_found = True
-                self.iterations_used = iterations  # Store iterations on success
-                return current_moves
-            
-            # Explore all possible moves
-            possible_moves = self.get_possible_moves(current_map, current_moves)
-            
-            for direction, new_map, new_moves in possible_moves:
-                queue.append((new_map, new_moves))
-            
-            # Progress indicator with memory management
-            if iterations % 5000 == 0:  # More frequent progress updates
-                elapsed_time = time.time() - self.start_time
-                log.debug(f"⏳ Explored {iterations} states, queue: {len(queue)}, time: {elapsed_time:.1f}s")
-                
-                # Memory management: limit queue size but less aggressively
-                if len(queue) > 200000:  # Increased threshold for better coverage
-                    log.debug("🧹 Trimming queue to manage memory...")
-                    # Keep more states (75% instead of 50%)
-                    queue = deque(list(queue)[:150000])
+                return True
+            return False
         
-        elapsed_time = time.time() - self.start_time if self.start_time else 0
-        log.warning(f"❌ No solution found after {iterations} iterations in {elapsed_time:.2f}s")
-        return None
+        while forward_frontier and backward_frontier and meeting_state is None and not stopped:
+            next_frontier = []
+            if len(forward_frontier) <= len(backward_frontier):
+                for state in forward_frontier:
+                    if limit_reached():
+                        stopped = True
+                        break
+                    iterations += 1
+                    for direction, delta, in_bounds_mask in board.directions:
+                        new_state = board.move(state, delta, in_bounds_mask)
+                        if new_state is None or new_state in forward_parents:
+                            continue
+                        forward_parents[new_state] = (state, direction)
+                        if new_state in backward_parents:
+                            meeting_state = new_state
+                            break
+                        if board.is_all_boxes_stuck(new_state):
+                            continue
+                        next_frontier.append(new_state)
+                    if meeting_state is not None:
+                        break
+                forward_frontier = next_frontier
+            else:
+                for state in backward_frontier:
+                    if limit_reached():
+                        stopped = True
+                        break
+                    iterations += 1
+                    for direction, previous_state in board.pulls(state):
+                        if previous_state in backward_parents:
+                            continue
+                        backward_parents[previous_state] = (state, direction)
+                        if previous_state in forward_parents:
+                            meeting_state = previous_state
+                            break
+                        next_frontier.append(previous_state)
+                    if meeting_state is not None:
+                        break
+                backward_frontier = next_frontier
+        
+        self.iterations_used = iterations
+        elapsed_time = time.monotonic() - self.start_time
+        
+        if meeting_state is None:
+            log.warning(f"❌ No solution found after {iterations} iterations in {elapsed_time:.2f}s")
+            return None
+        
+        # Stitch: start -> meeting state, then meeting state -> goal
+        moves = self._reconstruct_path(meeting_state, forward_parents)
+        link = backward_parents[meeting_state]
+        while link is not None:
+            next_state, direction = link
+            moves.append(direction)
+            link = backward_parents[next_state]
+        
+        log.success(f"✅ Solution found in {iterations} iterations!")
+        log.info(f"📏 Solution length: {len(moves)} moves")
+        log.info(f"⏰ Time taken: {elapsed_time:.2f}s")
+        self.solution_found = True
+        return moves
     
     def get_statistics(self) -> dict:
         """Get search statistics"""
         return {
-            'visited_states': len(self.visited_states),
+            'visited_states': len(self.predecessors) + len(self.ida_table),
             'solution_found': self.solution_found,
             'algorithm': 'Breadth-First Search (Optimized)'
         }
 
 
-def solve_with_bfs(game_map: GameMap, max_iterations: int = 50000, time_limit: float = 60.0):
+def solve_with_bfs(game_map: GameMap, max_iterations: int = 50000, time_limit: float = 60.0,
+                   bidirectional: bool = False, workers: int = 1):
     """
     Optimized convenience function to solve Sokoban puzzle with BFS.
     
@@ -324,11 +445,13 @@ def solve_with_bfs(game_map: GameMap, max_iterations: int = 50000, time_limit: f
         game_map: The game map to solve
         max_iterations: Maximum number of iterations before giving up
         time_limit: Maximum time in seconds before giving up
+        bidirectional: Also search backwards from the goal states
+        workers: Number of processes used to expand large frontiers
         
     Returns:
         Dictionary with 'moves' (list of moves or None) and 'iterations' (count)
     """
-    solver = BreadthFirstSearch(game_map, max_iterations, time_limit)
+    solver = BreadthFirstSearch(game_map, max_iterations, time_limit, bidirectional, workers)
     moves = solver.solve()
     
     # Return dictionary with moves and iteration count
@@ -3,7 +3,11 @@ Sokoban Bot - Automatic Solver Interface
 Provides a unified interface to use different pathfinding algorithms for solving Sokoban puzzles.
 """
 
-from typing import Optional, Dict
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from types import MappingProxyType
+from typing import Callable, Mapping, NamedTuple, Optional, Dict, Tuple
+import multiprocessing
 import time
 from ..game_manager import GameMap
 from .breadth_first_search import solve_with_bfs
@@ -15,30 +19,70 @@ log = get_logger(__name__)
 
 TIME_LIMIT_DEFAULT = 600.0  # seconds - reasonable default for UI responsiveness
 
+# Algorithms auto_solve tries, in order of preference
+AUTO_SOLVE_ORDER = ('astar', 'bfs')
+
+# Successful solves kept per bot; the least recently used is dropped past this
+SOLUTION_CACHE_SIZE = 64
+
+
+class AlgoSpec(NamedTuple):
+    """Static description of one solver"""
+    name: str
+    solver: Callable
+    description: str
+    optimal: bool
+    max_iterations: int
+    time_limit: float
+
+
+ALGORITHMS: Dict[str, AlgoSpec] = {
+    'bfs': AlgoSpec(
+        name='Breadth-First Search',
+        solver=solve_with_bfs,
+        description='Guarantees shortest solution but may be slow for complex puzzles',
+        optimal=True,
+        max_iterations=50000,  # Increased for multi-box puzzles
+        time_limit=TIME_LIMIT_DEFAULT
+    ),
+    'astar': AlgoSpec(
+        name='A* Search',
+        solver=solve_with_astar,
+        description='Fast and often finds good solutions using heuristics',
+        optimal=False,
+        max_iterations=100000,  # Significantly increased for complex multi-box puzzles
+        time_limit=TIME_LIMIT_DEFAULT
+    ),
+}
+
+
+# Read-only dict view of ALGORITHMS for get_algorithm_info, built once and shared by every bot
+ALGORITHM_INFO: Mapping[str, Mapping] = MappingProxyType(
+    {key: MappingProxyType(spec._asdict()) for key, spec in ALGORITHMS.items()}
+)
+
+
+def _solve_in_process(game_map: GameMap, algorithm: str, max_iterations: int, time_limit: float) -> Dict:
+    """Worker entry point: run one solver in a separate process"""
+    return SokobanBot().solve(game_map, algorithm, max_iterations, time_limit)
+
+
+def _solve_task(task: Tuple[GameMap, str, int, float]) -> Dict:
+    """Pool.imap_unordered entry point for _solve_in_process"""
+    return _solve_in_process(*task)
+
+
 class SokobanBot:
     """
     Sokoban Bot that can automatically solve puzzles using different algorithms.
     """
     
     def __init__(self):
-        self.algorithms = {
-            'bfs': {
-                'name': 'Breadth-First Search',
-                'solver': solve_with_bfs,
-                'description': 'Guarantees shortest solution but may be slow for complex puzzles',
-                'optimal': True,
-                'max_iterations': 50000,  # Increased for multi-box puzzles
-                'time_limit': TIME_LIMIT_DEFAULT
-            },
-            'astar': {
-                'name': 'A* Search',
-                'solver': solve_with_astar,
-                'description': 'Fast and often finds good solutions using heuristics',
-                'optimal': False,
-                'max_iterations': 100000,  # Significantly increased for complex multi-box puzzles
-                'time_limit': TIME_LIMIT_DEFAULT
-            },
-        }
+        # solve() reads the specs by attribute; the dict view is kept for get_algorithm_info callers
+        self._specs: Dict[str, AlgoSpec] = dict(ALGORITHMS)
+        self.algorithms = ALGORITHM_INFO
+        # Successful results by (algorithm, map state, limits); the solvers are deterministic
+        self._solution_cache: OrderedDict[Tuple, Dict] = OrderedDict()
     
     def solve(self, game_map: GameMap, algorithm: str = 'astar', max_iterations: Optional[int] = None, time_limit: Optional[float] = None) -> Dict:
         """
@@ -53,23 +97,28 @@ class SokobanBot:
         Returns:
             Dictionary with solution results
         """
-        if algorithm not in self.algorithms:
-            raise ValueError(f"Unknown algorithm: {algorithm}. Available: {list(self.algorithms.keys())}")
+        spec = self._specs.get(algorithm)
+        if spec is None:
+            raise ValueError(f"Unknown algorithm: {algorithm}. Available: {list(self._specs)}")
         
-        algo_info = self.algorithms[algorithm]
-        iterations = max_iterations or algo_info['max_iterations']
-        time_limit_val = time_limit or algo_info['time_limit']
-        
-        log.info(f"🤖 Starting Sokoban Bot with {algo_info['name']}")
-        log.info(f"📝 {algo_info['description']}")
-        log.info(f"⚙️  Max iterations: {iterations}, Time limit: {time_limit_val}s")
-        log.info("-" * 50)
+        iterations = max_iterations or spec.max_iterations
+        time_limit_val = time_limit or spec.time_limit
         
         start_time = time.time()
         
+        cache_key = (algorithm, self._state_key(game_map), iterations, time_limit_val)
+        cached = self._solution_cache.get(cache_key)
+        if cached is not None:
+            self._solution_cache.move_to_end(cache_key)
+            log.info("🤖 {}: reusing cached solution ({} moves)", spec.name, cached['move_count'])
+            # solve_time reports this lookup, not the original search
+            return dict(cached, moves=list(cached['moves']), solve_time=time.time() - start_time, cached=True)
+        
+        log.info("🤖 Bot start algo={} iters={} tlim={:.1f}s", spec.name, iterations, time_limit_val)
+        
         try:
             # Call solver with both iterations and time limit
-            solver_result = algo_info['solver'](game_map, iterations, time_limit_val)
+            solver_result = spec.solver(game_map, iterations, time_limit_val)
             solve_time = time.time() - start_time
             
             # Handle both dict and list returns for backwards compatibility
@@ -82,65 +131,92 @@ class SokobanBot:
             
             result = {
                 'success': solution is not None and len(solution) > 0 if solution else False,
-                'algorithm': algo_info['name'],
+                'algorithm': spec.name,
                 'algorithm_key': algorithm,
                 'moves': solution,
                 'move_count': len(solution) if solution else 0,
                 'solve_time': solve_time,
-                'optimal': algo_info['optimal'],
+                'optimal': spec.optimal,
                 'iterations_used': iterations_used,
                 'max_iterations': iterations,
-                'time_limit': time_limit_val
+                'time_limit': time_limit_val,
+                'cached': False
             }
             
             if solution:
-                log.success("✅ Puzzle solved successfully!")
-                log.info(f"📏 Solution: {len(solution)} moves")
-                log.info(f"🔄 Iterations: {iterations_used}")
-                log.info(f"⏱️  Time taken: {solve_time:.2f} seconds")
-                log.info(f"🎯 Moves: {' '.join(solution)}")
+                if len(self._solution_cache) >= SOLUTION_CACHE_SIZE:
+                    # Evict the least recently used entry
+                    self._solution_cache.popitem(last=False)
+                self._solution_cache[cache_key] = dict(result, moves=list(solution))
+                log.success("✅ Solved: {} moves, {} iterations, {:.2f}s",
+                            len(solution), iterations_used, solve_time)
+                log.opt(lazy=True).info("🎯 Moves: {}", lambda: ' '.join(solution))
             else:
-                log.warning(f"❌ No solution found within {iterations} iterations or {time_limit_val}s")
-                log.info(f"⏱️  Time taken: {solve_time:.2f} seconds")
+                log.warning("❌ No solution within {} iterations or {}s ({:.2f}s taken)",
+                            iterations, time_limit_val, solve_time)
             
             return result
             
         except Exception as e:
             solve_time = time.time() - start_time
-            log.error(f"💥 Error during solving: {e}")
+            log.error("💥 Error during solving: {}", e)
             
             return {
                 'success': False,
-                'algorithm': algo_info['name'],
+                'algorithm': spec.name,
+                'algorithm_key': algorithm,
                 'moves': None,
                 'move_count': 0,
                 'solve_time': solve_time,
-                'optimal': algo_info['optimal'],
+                'optimal': spec.optimal,
                 'error': str(e)
             }
 
-    def compare_algorithms(self, game_map: GameMap, algorithms: list[str] | None = None) -> dict:
+    @staticmethod
+    def _state_key(game_map: GameMap) -> Tuple:
+        """Hashable description of a map's layout and current player/box positions"""
+        player_pos = game_map.player.position.to_tuple() if game_map.player else None
+        box_positions = tuple(sorted(box.position.to_tuple() for box in game_map.boxes))
+        return (tuple(game_map.original_level_data), player_pos, box_positions)
+    
+    def compare_algorithms(self, game_map: GameMap, algorithms: list[str] | None = None,
+                           workers: int = 1) -> dict:
         """
         Compare multiple algorithms on the same puzzle.
         
         Args:
             game_map: The game map to solve
             algorithms: List of algorithms to compare (uses all if None)
+            workers: Number of processes to run the solvers in (1 = run them one after another)
             
         Returns:
             Dictionary with comparison results
         """
         if algorithms is None:
-            algorithms = list(self.algorithms.keys())
+            algorithms = list(self._specs)
+        algorithms = [algo for algo in algorithms if algo in self._specs]
         
         log.info("🏁 Starting algorithm comparison...")
         log.info("=" * 60)
         
         results = {}
         
-        for algo in algorithms:
-            if algo in self.algorithms:
-                log.info(f"\n🔄 Testing {self.algorithms[algo]['name']}...")
+        if workers > 1 and len(algorithms) > 1:
+            # Solvers are independent and CPU-bound: run each in its own process
+            log.info("🔀 Running {} solvers in parallel on {} processes", len(algorithms), workers)
+            with ProcessPoolExecutor(min(workers, len(algorithms))) as executor:
+                futures = {
+                    algo: executor.submit(
+                        _solve_in_process, game_map, algo,
+                        self._specs[algo].max_iterations, self._specs[algo].time_limit
+                    )
+                    for algo in algorithms
+                }
+                for algo, future in futures.items():
+                    results[algo] = future.result()
+        else:
+            for algo in algorithms:
+                log.info("\n🔄 Testing {}...", self._specs[algo].name)
                 result = self.solve(game_map, algo)
                 results[algo] = result
         
@@ -155,7 +231,8 @@ class SokobanBot:
             moves = result['move_count'] if result['success'] else "N/A"
             time_taken = result['solve_time']
             
-            log.info(f"{self.algorithms[algo]['name']:20} | {status:9} | {str(moves):8} moves | {time_taken:6.2f}s")
+            log.info("{:20} | {:9} | {:8} moves | {:6.2f}s",
+                     self._specs[algo].name, status, str(moves), time_taken)
             
             if result['success']:
                 successful_solutions.append((algo, result))
@@ -163,12 +240,13 @@ class SokobanBot:
         # Find best solution
         if successful_solutions:
             best_algo = min(successful_solutions, key=lambda x: x[1]['move_count'])
-            log.success(f"\n🏆 Best solution: {self.algorithms[best_algo[0]]['name']} ({best_algo[1]['move_count']} moves)")
+            log.success("\n🏆 Best solution: {} ({} moves)",
+                        self._specs[best_algo[0]].name, best_algo[1]['move_count'])
         
         return results
     
-    def get_algorithm_info(self, algorithm: Optional[str] = None) -> Dict:
-        """Get information about available algorithms."""
+    def get_algorithm_info(self, algorithm: Optional[str] = None) -> Mapping:
+        """Get information about available algorithms (read-only views, nothing is copied)."""
         if algorithm:
             if algorithm in self.algorithms:
                 return self.algorithms[algorithm]
@@ -177,37 +255,54 @@ class SokobanBot:
         else:
             return self.algorithms
     
-    def auto_solve(self, game_map: GameMap) -> Dict:
+    def auto_solve(self, game_map: GameMap, workers: int = 1) -> Dict:
         """
         Automatically choose the best algorithm for the given puzzle.
         
         Args:
             game_map: The game map to solve
+            workers: With more than 1, race the solvers in separate processes and
+                return the first solution found instead of trying them in turn
             
         Returns:
             Dictionary with solution results
         """
-        # Simple heuristic: try A* first, then BFS for small puzzles, SA for large ones
+        # Simple heuristic: try A* first, then BFS for an optimal solution
         puzzle_size = game_map.width * game_map.height
         num_boxes = len(game_map.boxes)
+        order = [algo for algo in AUTO_SOLVE_ORDER if algo in self._specs]
         
         log.info(f"🧠 Auto-selecting algorithm for puzzle (size: {puzzle_size}, boxes: {num_boxes})")
         
-        # Try A* first (good balance of speed and optimality)
-        result = self.solve(game_map, 'astar')
-        if result['success']:
-            return result
-        
-        # If A* fails and puzzle is small, try BFS for optimal solution
-        log.info("🔄 Trying BFS for optimal solution on small puzzle...")
-        result = self.solve(game_map, 'bfs')
-        if result['success']:
-            return result
+        if workers > 1 and len(order) > 1:
+            return self._race_solvers(game_map, order, workers)
         
-        # If both fail, try SA as last resort
-        log.info("🔥 Trying Simulated Annealing as last resort...")
-        result = self.solve(game_map, 'sa')
+        result = None
+        for algo in order:
+            if result is not None:
+                log.info(f"🔄 Trying {self._specs[algo].name}...")
+            result = self.solve(game_map, algo)
+            if result['success']:
+                return result
         return result
+    
+    def _race_solvers(self, game_map: GameMap, order: list[str], workers: int) -> Dict:
+        """Run the solvers concurrently; the first successful result wins"""
+        log.info(f"🏎️  Racing {len(order)} solvers on {workers} processes")
+        tasks = [
+            (game_map, algo, self._specs[algo].max_iterations, self._specs[algo].time_limit)
+            for algo in order
+        ]
+        results = {}
+        # Leaving the Pool context terminates solvers that are still running
+        with multiprocessing.Pool(min(workers, len(order))) as pool:
+            for result in pool.imap_unordered(_solve_task, tasks):
+                if result['success']:
+                    log.success(f"🏁 {result['algorithm']} finished first")
+                    return result
+                results[result['algorithm_key']] = result
+        # Nobody solved it: report the last-resort solver's attempt, as the sequential chain does
+        return results[order[-1]]
         
 
 def demo_solver():
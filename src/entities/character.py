@@ -40,7 +40,6 @@ class Player(MovableEntity):
             log_player_action(f"moved from {old_pos} to {new_position}", success=True, 
                              moves=self.moves, pushes=self.pushes)
     
-    @log_function_call("DEBUG")  # Changed to DEBUG to reduce log volume
     def push_box(self, log_action: bool = True):
         """Increment push counter when player pushes a box"""
         self.pushes += 1
@@ -59,7 +58,7 @@ class Player(MovableEntity):
         else:
             self.entity_type = EntityType.PLAYER
         
-        log.debug(f"🎯 Player dock status changed: {old_status} -> {on_dock}")
+        log.debug("🎯 Player dock status changed: {} -> {}", old_status, on_dock)
     
     def reset_stats(self):
         """Reset move and push counters"""
@@ -1,18 +1,37 @@
-from typing import List, Optional, Dict, Tuple
+import copy
+from typing import List, Optional, Dict, Tuple, FrozenSet
 from .base import Entity, Position, EntityType
 from .entities import Wall, Floor, Player, Box, Dock
-from .log.logger import get_logger, catch_and_log, log_function_call, log_game_event, log_performance
+from .log.logger import get_logger, catch_and_log, log_game_event, log_performance
 
 # Get logger for this module
 log = get_logger(__name__)
 
+# Movement offset (dx, dy) per direction
+_OFFSETS: Dict[str, Tuple[int, int]] = {
+    'up': (0, -1),
+    'down': (0, 1),
+    'left': (-1, 0),
+    'right': (1, 0)
+}
+
+# Opposite neighbour offsets per axis (left/right, up/down) for box movability checks
+_PUSH_AXES: Tuple[Tuple[Tuple[int, int], Tuple[int, int]], ...] = (
+    ((-1, 0), (1, 0)),
+    ((0, -1), (0, 1)),
+)
+
+# Static analysis per level layout (walls, blocked cells, docks, dead squares,
+# pull-distance maps), shared by every GameMap built from the same level
+_static_cache: Dict[Tuple[str, ...], Tuple] = {}
+_STATIC_CACHE_SIZE = 32
+
 
 class GameMap:
     """Manages the game map and entities"""
     
-    @log_function_call("INFO")
     def __init__(self, level_data: List[str]):
-        log.info(f"🗺️  Initializing game map with {len(level_data)} rows")
+        log.info("🗺️  Initializing game map with {} rows", len(level_data))
         self.width = max(len(line) for line in level_data) if level_data else 0
         self.height = len(level_data)
         self.original_level_data = level_data.copy()
@@ -22,6 +41,18 @@ class GameMap:
         self.player: Optional[Player] = None
         self.boxes: List[Box] = []
         self.docks: List[Dock] = []
+        self._box_index_cache: Optional[Dict[Tuple[int, int], Box]] = None
+        self._box_positions_frozen: FrozenSet[Tuple[int, int]] = frozenset()
+        self._wall_positions: FrozenSet[Tuple[int, int]] = frozenset()
+        self._blocked_positions: FrozenSet[Tuple[int, int]] = frozenset()
+        self._dock_positions: FrozenSet[Tuple[int, int]] = frozenset()
+        self._dock_at: Dict[Tuple[int, int], Dock] = {}
+        self._dead_positions: FrozenSet[Tuple[int, int]] = frozenset()
+        self._pull_distance_cache: Dict[Tuple[int, int], Dict[Tuple[int, int], int]] = {}  # Per dock, shared per level
+        self._row_cache: Dict[int, str] = {}  # y -> rendered row, dropped when the row changes
+        self._positions: Dict[Tuple[int, int], Position] = {}  # Shared Position per cell
+        self._boxes_on_dock = 0  # Maintained by _move_box so the goal test is O(1)
+        self._initial_state: Tuple[Optional[Tuple[int, int]], FrozenSet[Tuple[int, int]]] = (None, frozenset())
         
         # Initialize map from level data
         self._parse_level_data(level_data)
@@ -33,10 +64,13 @@ class GameMap:
         self.boxes.clear()
         self.docks.clear()
         self.player = None
+        self._row_cache.clear()
+        self._box_index_cache = None
+        self._positions = {}
         
         for y, row in enumerate(level_data):
             for x, char in enumerate(row):
-                position = Position(x, y)
+                position = self._position_at((x, y))
                 
                 if char == '#':  # Wall
                     self._add_entity(Wall(position))
@@ -74,6 +108,149 @@ class GameMap:
                     self.boxes.append(box)
                 else:  # Unknown character, treat as floor
                     self._add_entity(Floor(position))
+        
+        self._box_positions_frozen = frozenset(box.position.to_tuple() for box in self.boxes)
+        self._boxes_on_dock = sum(1 for box in self.boxes if box.on_dock)
+        self._dock_at = {dock.position.to_tuple(): dock for dock in self.docks}
+        
+        layout = tuple(level_data)
+        static = _static_cache.get(layout)
+        if static is not None:
+            # Same level seen before: reuse its wall, dock and deadlock analysis
+            (self._wall_positions, self._blocked_positions, self._dock_positions,
+             self._dead_positions, self._pull_distance_cache) = static
+        else:
+            # Walls never move, so deadlock checks can test membership instead of scanning entities
+            self._wall_positions = frozenset(
+                pos for pos, entities in self.entities.items()
+                if any(entity.entity_type == EntityType.WALL for entity in entities)
+            )
+            # Walls plus a one-cell ring around the map, so neighbour checks need no bounds test
+            border = {(x, y) for x in range(-1, self.width + 1) for y in (-1, self.height)}
+            border |= {(x, y) for x in (-1, self.width) for y in range(self.height)}
+            self._blocked_positions = self._wall_positions | border
+            self._dock_positions = frozenset(self._dock_at)
+            self._dead_positions = self._precompute_dead_squares()
+            self._pull_distance_cache = {}
+            if len(_static_cache) >= _STATIC_CACHE_SIZE:
+                # Evict the oldest entry
+                del _static_cache[next(iter(_static_cache))]
+            _static_cache[layout] = (
+                self._wall_positions, self._blocked_positions, self._dock_positions,
+                self._dead_positions, self._pull_distance_cache
+            )
+        # Starting positions, so reset_level can move pieces back instead of re-parsing
+        player_pos = self.player.position.to_tuple() if self.player else None
+        self._initial_state = (player_pos, self._box_positions_frozen)
+    
+    def _precompute_dead_squares(self) -> FrozenSet[Tuple[int, int]]:
+        """
+        Floor cells from which a box can never reach a dock (simple deadlocks).
+        Found by pulling a box backwards from every dock: cells never reached are dead.
+        This covers every non-dock corner and also dead stretches along walls.
+        """
+        blocked = self._blocked_positions
+        live = set(self._dock_positions)
+        frontier = list(live)
+        while frontier:
+            x, y = frontier.pop()
+            for dx, dy in _OFFSETS.values():
+                # Player at the box's side steps away, dragging the box one cell
+                box_pos = (x + dx, y + dy)
+                player_pos = (x + 2 * dx, y + 2 * dy)
+                if box_pos not in live and box_pos not in blocked and player_pos not in blocked:
+                    live.add(box_pos)
+                    frontier.append(box_pos)
+        
+        return frozenset(
+            (x, y) for y in range(self.height) for x in range(self.width)
+            if (x, y) not in blocked and (x, y) not in live
+        )
+    
+    def _pull_distances(self, dock: Tuple[int, int]) -> Dict[Tuple[int, int], int]:
+        """
+        Fewest pushes that bring a box from each cell to dock, ignoring other boxes.
+        Same backwards pull as _precompute_dead_squares, done breadth-first to
+        count the steps; cells missing from the result can never reach the dock.
+        Computed once per dock and level; callers must not modify the result.
+        """
+        cached = self._pull_distance_cache.get(dock)
+        if cached is not None:
+            return cached
+        blocked = self._blocked_positions
+        distances = {dock: 0}
+        frontier = [dock]
+        steps = 0
+        while frontier:
+            steps += 1
+            next_frontier = []
+            for x, y in frontier:
+                for dx, dy in _OFFSETS.values():
+                    box_pos = (x + dx, y + dy)
+                    player_pos = (x + 2 * dx, y + 2 * dy)
+                    if box_pos not in distances and box_pos not in blocked and player_pos not in blocked:
+                        distances[box_pos] = steps
+                        next_frontier.append(box_pos)
+            frontier = next_frontier
+        self._pull_distance_cache[dock] = distances
+        return distances
+    
+    def __copy__(self) -> 'GameMap':
+        """
+        Copy for search algorithms: walls and floors are shared, while the
+        player, boxes and docks (which carry mutable state) get shallow copies.
+        Much cheaper than copy.deepcopy and independent for moves.
+        Wall cells never gain or lose an entity, so their lists are shared too.
+        """
+        new_map = object.__new__(GameMap)
+        new_map.width = self.width
+        new_map.height = self.height
+        new_map.original_level_data = self.original_level_data
+        
+        clones: Dict[int, Entity] = {}
+        new_map.player = None
+        if self.player:
+            new_map.player = copy.copy(self.player)
+            clones[id(self.player)] = new_map.player
+        new_map.boxes = []
+        for box in self.boxes:
+            new_box = copy.copy(box)
+            clones[id(box)] = new_box
+            new_map.boxes.append(new_box)
+        new_map.docks = []
+        for dock in self.docks:
+            new_dock = copy.copy(dock)
+            clones[id(dock)] = new_dock
+            new_map.docks.append(new_dock)
+        
+        walls = self._wall_positions
+        new_map.entities = {
+            pos: entities if pos in walls else [clones.get(id(entity), entity) for entity in entities]
+            for pos, entities in self.entities.items()
+        }
+        new_map._box_index_cache = None
+        new_map._box_positions_frozen = self._box_positions_frozen
+        new_map._wall_positions = self._wall_positions
+        new_map._blocked_positions = self._blocked_positions
+        new_map._dock_positions = self._dock_positions
+        new_map._dock_at = {dock.position.to_tuple(): dock for dock in new_map.docks}
+        new_map._dead_positions = self._dead_positions
+        new_map._pull_distance_cache = self._pull_distance_cache
+        new_map._row_cache = {}
+        new_map._positions = self._positions
+        new_map._boxes_on_dock = self._boxes_on_dock
+        new_map._initial_state = self._initial_state
+        return new_map
+    
+    def _position_at(self, pos: Tuple[int, int]) -> Position:
+        """
+        The map's single Position object for a cell. Positions are never mutated
+        (entities get a new one when they move), so every entity and move can share it.
+        """
+        position = self._positions.get(pos)
+        if position is None:
+            position = self._positions[pos] = Position(*pos)
+        return position
     
     def _add_entity(self, entity: Entity):
         """Add entity to the map"""
@@ -81,6 +258,7 @@ class GameMap:
         if pos_tuple not in self.entities:
             self.entities[pos_tuple] = []
         self.entities[pos_tuple].append(entity)
+        self._row_cache.pop(pos_tuple[1], None)
     
     def _remove_entity(self, entity: Entity):
         """Remove entity from the map"""
@@ -90,6 +268,14 @@ class GameMap:
                 self.entities[pos_tuple].remove(entity)
             if not self.entities[pos_tuple]:
                 del self.entities[pos_tuple]
+        self._row_cache.pop(pos_tuple[1], None)
+    
+    @property
+    def _box_index(self) -> Dict[Tuple[int, int], Box]:
+        """Position -> box lookup, built lazily and invalidated when a box moves"""
+        if self._box_index_cache is None:
+            self._box_index_cache = {box.position.to_tuple(): box for box in self.boxes}
+        return self._box_index_cache
     
     def get_entities_at(self, position: Position) -> List[Entity]:
         """Get all entities at the given position"""
@@ -113,59 +299,46 @@ class GameMap:
         """Check if position is within map bounds"""
         return 0 <= position.x < self.width and 0 <= position.y < self.height
     
+    def _is_occupied(self, pos: Tuple[int, int]) -> bool:
+        """Off the map, or holding a solid entity (wall, box or the player)"""
+        if pos in self._blocked_positions or pos in self._box_positions_frozen:
+            return True
+        return self.player is not None and self.player.position.to_tuple() == pos
+    
     def can_move_to(self, position: Position) -> bool:
         """Check if position can be moved to (not blocked by solid entities)"""
-        if not self.is_position_valid(position):
-            return False
-        
-        entities = self.get_entities_at(position)
-        for entity in entities:
-            if entity.is_solid():
-                return False
-        return True
+        return not self._is_occupied(position.to_tuple())
     
     @log_performance
     @catch_and_log(level="WARNING", message="Player movement failed")
     def move_player(self, direction: str) -> bool:
         """Move player in the given direction (human player - no deadlock detection)"""
-        log.debug(f"🎮 Attempting to move player {direction}")
+        log.debug("🎮 Attempting to move player {}", direction)
         
         if not self.player:
             log.error("❌ No player found to move")
             return False
         
         # Calculate movement offset
-        offsets = {
-            'up': (0, -1),
-            'down': (0, 1),
-            'left': (-1, 0),
-            'right': (1, 0)
-        }
-        
-        if direction not in offsets:
-            log.warning(f"⚠️ Invalid movement direction: {direction}")
+        offset = _OFFSETS.get(direction)
+        if offset is None:
+            log.warning("⚠️ Invalid movement direction: {}", direction)
             return False
         
-        dx, dy = offsets[direction]
+        dx, dy = offset
         new_position = Position(self.player.x + dx, self.player.y + dy)
         
         if not self.is_position_valid(new_position):
             return False
         
-        # Check what's at the target position
-        target_entities = self.get_entities_at(new_position)
-        
-        # Check for walls
-        for entity in target_entities:
-            if entity.entity_type == EntityType.WALL:
-                return False
-        
-        # Check for boxes
+        # Check what's at the target position: walls block, a box may be pushed
         box_at_target = None
-        for entity in target_entities:
-            if isinstance(entity, Box):
+        for entity in self.get_entities_at(new_position):
+            entity_type = entity.entity_type
+            if entity_type == EntityType.WALL:
+                return False
+            if entity_type in (EntityType.BOX, EntityType.BOX_ON_DOCK) and box_at_target is None:
                 box_at_target = entity
-                break
         
         if box_at_target:
             # Try to push the box (no deadlock detection for human player)
@@ -191,41 +364,27 @@ class GameMap:
             return False
         
         # Calculate movement offset
-        offsets = {
-            'up': (0, -1),
-            'down': (0, 1),
-            'left': (-1, 0),
-            'right': (1, 0)
-        }
-        
-        if direction not in offsets:
-            log.warning(f"⚠️ Invalid movement direction: {direction}")
+        offset = _OFFSETS.get(direction)
+        if offset is None:
+            log.warning("⚠️ Invalid movement direction: {}", direction)
             return False
         
-        dx, dy = offsets[direction]
-        new_position = Position(self.player.x + dx, self.player.y + dy)
+        dx, dy = offset
+        target = (self.player.x + dx, self.player.y + dy)
         
-        if not self.is_position_valid(new_position):
+        # Bounds and walls are checked on the coordinate tuple, so rejected
+        # moves never build a Position or scan entity lists
+        if target in self._blocked_positions:
             return False
         
-        # Check what's at the target position
-        target_entities = self.get_entities_at(new_position)
-        
-        # Check for walls
-        for entity in target_entities:
-            if entity.entity_type == EntityType.WALL:
-                return False
+        new_position = self._position_at(target)
         
         # Check for boxes
-        box_at_target = None
-        for entity in target_entities:
-            if isinstance(entity, Box):
-                box_at_target = entity
-                break
+        box_at_target = self._box_index.get(target)
         
         if box_at_target:
             # Try to push the box (WITH deadlock detection for bot)
-            box_new_position = Position(new_position.x + dx, new_position.y + dy)
+            box_new_position = self._position_at((target[0] + dx, target[1] + dy))
             if not self._can_push_box_with_deadlock_detection(box_at_target, box_new_position):
                 return False
             
@@ -253,63 +412,28 @@ class GameMap:
     def _is_box_in_corner(self, position: Position) -> bool:
         """Check if position is in a corner with walls (based on reference check_in_corner)"""
         x, y = position.x, position.y
+        walls = self._wall_positions
         
-        # Check all 4 diagonal corners
-        # Top-left corner (x-1, y-1)
-        if self.get_entity_of_type_at(Position(x - 1, y - 1), EntityType.WALL):
-            if (self.get_entity_of_type_at(Position(x - 1, y), EntityType.WALL) and 
-                self.get_entity_of_type_at(Position(x, y - 1), EntityType.WALL)):
-                return True
-        
-        # Bottom-left corner (x-1, y+1)
-        if self.get_entity_of_type_at(Position(x - 1, y + 1), EntityType.WALL):
-            if (self.get_entity_of_type_at(Position(x - 1, y), EntityType.WALL) and 
-                self.get_entity_of_type_at(Position(x, y + 1), EntityType.WALL)):
-                return True
-        
-        # Top-right corner (x+1, y-1)
-        if self.get_entity_of_type_at(Position(x + 1, y - 1), EntityType.WALL):
-            if (self.get_entity_of_type_at(Position(x + 1, y), EntityType.WALL) and 
-                self.get_entity_of_type_at(Position(x, y - 1), EntityType.WALL)):
-                return True
-        
-        # Bottom-right corner (x+1, y+1)
-        if self.get_entity_of_type_at(Position(x + 1, y + 1), EntityType.WALL):
-            if (self.get_entity_of_type_at(Position(x + 1, y), EntityType.WALL) and 
-                self.get_entity_of_type_at(Position(x, y + 1), EntityType.WALL)):
+        # Check all 4 diagonal corners: the diagonal and both orthogonal neighbours are walls
+        for dx, dy in ((-1, -1), (-1, 1), (1, -1), (1, 1)):
+            if (x + dx, y + dy) in walls and (x + dx, y) in walls and (x, y + dy) in walls:
                 return True
         
         return False
     
-    def _is_box_can_be_moved(self, position: Position) -> bool:
-        """Check if a box at position can be moved in at least one direction (based on reference is_box_can_be_moved)"""
-        x, y = position.x, position.y
-        
-        # Helper to check if position is walkable or has player
-        def is_walkable(pos: Position) -> bool:
-            if not self.is_position_valid(pos):
-                return False
-            entities = self.get_entities_at(pos)
-            for entity in entities:
-                if entity.entity_type == EntityType.WALL or entity.entity_type == EntityType.BOX:
-                    return False
-            return True
-        
-        # Check left-right movement
-        left = Position(x - 1, y)
-        right = Position(x + 1, y)
-        if (is_walkable(left) or self.player and self.player.position == left) and is_walkable(right):
-            return True
-        if (is_walkable(right) or self.player and self.player.position == right) and is_walkable(left):
-            return True
-        
-        # Check up-down movement
-        up = Position(x, y - 1)
-        down = Position(x, y + 1)
-        if (is_walkable(up) or self.player and self.player.position == up) and is_walkable(down):
-            return True
-        if (is_walkable(down) or self.player and self.player.position == down) and is_walkable(up):
-            return True
+    def _is_box_can_be_moved(self, x: int, y: int) -> bool:
+        """Check if a box at (x, y) can be moved in at least one direction (based on reference is_box_can_be_moved)"""
+        blocked = self._blocked_positions
+        boxes = self._box_positions_frozen
+        
+        # A box can move along an axis if the cells on both sides are walkable.
+        # Off-map cells are in the blocked set, and the player's own cell is never a wall or box.
+        for (ax, ay), (bx, by) in _PUSH_AXES:
+            side_a = (x + ax, y + ay)
+            side_b = (x + bx, y + by)
+            if (side_a not in blocked and side_a not in boxes
+                    and side_b not in blocked and side_b not in boxes):
+                return True
         
         return False
     
@@ -320,53 +444,70 @@ class GameMap:
             if box.on_dock:
                 return False
             # If box can be moved, not all stuck
-            if self._is_box_can_be_moved(box.position):
+            position = box.position
+            if self._is_box_can_be_moved(position.x, position.y):
                 return False
         return True
     
     def _can_push_box_with_deadlock_detection(self, box: Box, new_position: Position) -> bool:
         """Check if box can be pushed to the new position with deadlock detection (for bot algorithms)"""
-        if not self.is_position_valid(new_position):
-            return False
+        target = new_position.to_tuple()
         
-        # Check for solid entities at target position
-        entities = self.get_entities_at(new_position)
-        for entity in entities:
-            if entity.is_solid():
-                return False
+        # Check for solid entities (or the map edge) at target position
+        if self._is_occupied(target):
+            return False
         
-        # CRITICAL: Enhanced deadlock detection based on reference implementation
-        dock_at_new_pos = self.get_entity_of_type_at(new_position, EntityType.DOCK)
-        if not dock_at_new_pos:  # Only check deadlock if not on goal
-            # Check if box would be stuck in corner
-            if self._is_box_in_corner(new_position):
-                log.debug(f"🚫 Corner deadlock detected: box at {new_position}")
-                return False
+        # CRITICAL: Enhanced deadlock detection based on reference implementation.
+        # Dead squares are precomputed per level and never include docks.
+        # Not logged: this rejects pushes on every search expansion.
+        if target in self._dead_positions:
+            return False
         
         return True
     
     def _move_box(self, box: Box, new_position: Position):
         """Move box to new position and update dock states"""
         old_position = box.position
+        self._box_index_cache = None
         
         # Remove box from old position
         self._remove_entity(box)
         
         # Update dock state at old position
-        old_dock = self.get_entity_of_type_at(old_position, EntityType.DOCK)
-        if old_dock and isinstance(old_dock, Dock):
+        old_dock = self._dock_at.get(old_position.to_tuple())
+        if old_dock:
             old_dock.remove_box()
             box.set_on_dock(False)
+            self._boxes_on_dock -= 1
         
         # Move box
         box.set_position(new_position)
         self._add_entity(box)
+        self._box_positions_frozen = (
+            self._box_positions_frozen - {old_position.to_tuple()}
+        ) | {new_position.to_tuple()}
         
         # Update dock state at new position
-        new_dock = self.get_entity_of_type_at(new_position, EntityType.DOCK)
-        if new_dock and isinstance(new_dock, Dock):
+        new_dock = self._dock_at.get(new_position.to_tuple())
+        if new_dock:
             new_dock.place_box()
             box.set_on_dock(True)
+            self._boxes_on_dock += 1
+    
+    def restore_state(self, player_pos: Tuple[int, int], box_positions) -> None:
+        """
+        Put the player and boxes back at the given positions (a search snapshot).
+        Only boxes that differ are moved, so undoing a single move costs O(boxes)
+        instead of copying the map or replaying the move history.
+        """
+        target = frozenset(box_positions)
+        current = self._box_positions_frozen
+        if target != current:
+            for old, new in zip(current - target, target - current):
+                self._move_box(self._box_index[old], self._position_at(new))
+        
+        if self.player and self.player.position.to_tuple() != player_pos:
+            self._move_player_to(self._position_at(player_pos), log_action=False)
     
     def _move_player_to(self, new_position: Position, log_action: bool = True):
         """Move player to new position and update dock states"""
@@ -379,8 +520,8 @@ class GameMap:
         self._remove_entity(self.player)
         
         # Update dock state at old position
-        old_dock = self.get_entity_of_type_at(old_position, EntityType.DOCK)
-        if old_dock and isinstance(old_dock, Dock):
+        old_dock = self._dock_at.get(old_position.to_tuple())
+        if old_dock:
             old_dock.remove_player()
             self.player.set_on_dock(False)
         
@@ -389,21 +530,19 @@ class GameMap:
         self._add_entity(self.player)
         
         # Update dock state at new position
-        new_dock = self.get_entity_of_type_at(new_position, EntityType.DOCK)
-        if new_dock and isinstance(new_dock, Dock):
+        new_dock = self._dock_at.get(new_position.to_tuple())
+        if new_dock:
             new_dock.place_player()
             self.player.set_on_dock(True)
     
     def is_level_complete(self) -> bool:
         """Check if all boxes are on docks"""
-        for box in self.boxes:
-            if not box.on_dock:
-                return False
-        return True
+        return self._boxes_on_dock == len(self.boxes)
     
     def reset_level(self):
         """Reset the level to its original state"""
-        self._parse_level_data(self.original_level_data)
+        # Walls and docks never change, so only the player and boxes need moving back
+        self.restore_state(*self._initial_state)
         if self.player:
             self.player.reset_stats()
     
@@ -416,6 +555,14 @@ class GameMap:
         # Return the topmost entity's representation
         return entities[-1].render()
     
+    def render_row(self, y: int) -> str:
+        """Render a whole row, reusing the last rendering until an entity in it changes"""
+        row = self._row_cache.get(y)
+        if row is None:
+            row = "".join(self.render_cell(Position(x, y)) for x in range(self.width))
+            self._row_cache[y] = row
+        return row
+    
     def get_moves(self) -> int:
         """Get player's move count"""
         return self.player.moves if self.player else 0
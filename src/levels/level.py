@@ -3,9 +3,10 @@ Sokoban Level Loader
 Loads levels from .slc XML files and provides level selection functionality.
 """
 
-import xml.etree.ElementTree as ET
+import os
+import re
 from pathlib import Path
-from typing import List, Optional
+from typing import BinaryIO, Dict, List, Optional, Tuple
 
 # Add logging
 from ..log.logger import get_logger, log_function_call, log_performance
@@ -13,16 +14,56 @@ from ..log.logger import get_logger, log_function_call, log_performance
 # Get logger for this module
 log = get_logger(__name__)
 
+# lxml's C parser is much faster on large collections; the stdlib parser has the same API
+try:
+    import lxml.etree as ET
+    _ITERPARSE_OPTIONS = {'huge_tree': True}
+except ImportError:
+    import xml.etree.ElementTree as ET
+    _ITERPARSE_OPTIONS = {}
+
+# How much of the file is searched for the start of the XML, past any download header
+_HEADER_SCAN_BYTES = 4096
+
+# HTML entities that may survive in level rows, decoded in a single pass
+_ENTITY_RE = re.compile(r"&(amp|lt|gt);")
+_ENTITY_CHARS = {"amp": "&", "lt": "<", "gt": ">"}
+
+# Level served when the requested one (or the whole collection) is unavailable
+_FALLBACK_LEVEL: Tuple[str, ...] = (
+    "########",
+    "#      #",
+    "#  $   #",
+    "#   . @#",
+    "#      #",
+    "########"
+)
+
 
 class SokobanLevel:
-    """Represents a single Sokoban level"""
+    """
+    Represents a single Sokoban level.
+    The rows are kept as one ASCII buffer (rows joined by newlines) and only
+    decoded into one string object per row the first time they are read.
+    """
+    
+    __slots__ = ("id", "width", "height", "_blob", "_lines", "number")
     
     def __init__(self, level_id: str, width: int, height: int, lines: List[str]):
         self.id = level_id
         self.width = width
         self.height = height
-        self.lines = lines
+        self._blob = "\n".join(lines).encode("ascii")
+        # Decoded rows, filled in by the first read of lines
+        self._lines: Optional[List[str]] = None if lines else []
         self.number: Optional[int] = None  # Will be set when loaded into collection
+    
+    @property
+    def lines(self) -> List[str]:
+        """The rows as strings, decoded from the buffer once"""
+        if self._lines is None:
+            self._lines = self._blob.decode("ascii").split("\n")
+        return self._lines
         
     def get_level_data(self) -> List[str]:
         """Get the level data as a list of strings"""
@@ -35,8 +76,11 @@ class SokobanLevel:
 class LevelCollection:
     """Manages a collection of Sokoban levels from .slc files"""
     
+    __slots__ = ("levels", "title", "description", "loaded_file", "_by_number")
+    
     def __init__(self):
         self.levels: List[SokobanLevel] = []
+        self._by_number: Dict[int, SokobanLevel] = {}  # 1-based position -> level
         self.title = ""
         self.description = ""
         self.loaded_file = None
@@ -52,47 +96,19 @@ class LevelCollection:
                 
             log.info(f"📁 Loading levels from: {path.name}")
             
-            # Read the file and handle potential header lines
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Find the XML declaration and remove any content before it
-            xml_start = content.find('<?xml')
-            if xml_start > 0:
-                content = content[xml_start:]
-                log.info("🔧 Removed non-XML header from file")
-            elif xml_start == -1:
-                # Look for the root element if no XML declaration
-                root_start = content.find('<SokobanLevels')
-                if root_start > 0:
-                    content = content[root_start:]
-                    log.info("🔧 Removed header, no XML declaration found")
-            
-            # Parse XML from cleaned content
-            root = ET.fromstring(content)
-            
-            # Extract metadata
-            title_elem = root.find("Title")
-            self.title = title_elem.text if title_elem is not None else "Unknown Collection"
-            
-            desc_elem = root.find("Description")
-            self.description = desc_elem.text if desc_elem is not None else ""
+            with open(file_path, 'rb') as f:
+                self._skip_header(f)
+                title, description, levels = self._stream_levels(f)
             
-            # Find level collection
-            level_collection = root.find("LevelCollection")
-            if level_collection is None:
+            self.title = title if title is not None else "Unknown Collection"
+            self.description = description if description is not None else ""
+            if levels is None:
                 log.error("❌ No LevelCollection found in file")
                 return False
-                
-            # Load all levels
-            levels = level_collection.findall("Level")
-            self.levels = []
             
-            for i, level_elem in enumerate(levels, 1):
-                level = self._parse_level(level_elem, i)
-                if level:
-                    self.levels.append(level)
-                    
+            self.levels = levels
+            # Keyed by position, matching get_level_count(), even if empty levels were skipped
+            self._by_number = dict(enumerate(levels, 1))
             log.info(f"✅ Loaded {len(self.levels)} levels from {self.title}")
             self.loaded_file = file_path
             return True
@@ -104,18 +120,80 @@ class LevelCollection:
             log.error(f"❌ Error loading levels: {e}")
             return False
             
+    @staticmethod
+    def _skip_header(f: BinaryIO) -> None:
+        """Position the file at the start of the XML, past any non-XML header lines"""
+        head = f.read(_HEADER_SCAN_BYTES)
+        
+        # Find the XML declaration and skip any content before it
+        start = head.find(b'<?xml')
+        if start > 0:
+            log.info("🔧 Removed non-XML header from file")
+        elif start == -1:
+            # Look for the root element if no XML declaration
+            start = head.find(b'<SokobanLevels')
+            if start > 0:
+                log.info("🔧 Removed header, no XML declaration found")
+        f.seek(max(start, 0))
+    
+    def _stream_levels(self, f: BinaryIO) -> Tuple[Optional[str], Optional[str], Optional[List[SokobanLevel]]]:
+        """
+        Parse the collection incrementally. Each <Level> is converted as soon as it
+        is complete and then dropped from the tree, as is every other top-level
+        element once read, so the whole document is never held in memory at once.
+        
+        Returns the title, description and levels; levels is None without a LevelCollection.
+        """
+        title = description = None
+        root = None
+        collection = None  # The first LevelCollection, while it is being parsed
+        found_collection = False
+        levels: List[SokobanLevel] = []
+        number = 0
+        depth = 0  # Root element is depth 1
+        
+        for event, elem in ET.iterparse(f, events=("start", "end"), **_ITERPARSE_OPTIONS):
+            if event == "start":
+                depth += 1
+                if depth == 1:
+                    root = elem
+                elif depth == 2 and elem.tag == "LevelCollection" and not found_collection:
+                    collection = elem
+                    found_collection = True
+                continue
+            
+            depth -= 1
+            if depth == 1:
+                # Metadata directly under the root; the first occurrence wins
+                if elem.tag == "Title" and title is None:
+                    title = elem.text
+                elif elem.tag == "Description" and description is None:
+                    description = elem.text
+                elif elem is collection:
+                    collection = None
+                root.remove(elem)
+            elif depth == 2 and elem.tag == "Level" and collection is not None:
+                number += 1
+                level = self._parse_level(elem, number)
+                if level:
+                    levels.append(level)
+                elem.clear()
+                collection.remove(elem)
+        
+        return title, description, (levels if found_collection else None)
+    
     def _parse_level(self, level_elem: ET.Element, number: int) -> Optional[SokobanLevel]:
         """Parse a single level from XML element"""
         try:
-            level_id = level_elem.get("Id", f"Level_{number}")
-            width = int(level_elem.get("Width", 0))
-            height = int(level_elem.get("Height", 0))
+            attrib = level_elem.attrib
+            level_id = attrib.get("Id")
+            if level_id is None:
+                level_id = f"Level_{number}"
+            width = int(attrib.get("Width", 0))
+            height = int(attrib.get("Height", 0))
             
-            # Extract level lines
-            lines = []
-            for line_elem in level_elem.findall("L"):
-                if line_elem.text:
-                    lines.append(line_elem.text)
+            # Extract level lines: the non-empty <L> children, in order
+            lines = [child.text for child in level_elem if child.tag == "L" and child.text]
                     
             if not lines:
                 log.warning(f"⚠️ Empty level: {level_id}")
@@ -127,7 +205,7 @@ class LevelCollection:
             level = SokobanLevel(level_id, width, height, lines)
             level.number = number
             
-            log.debug(f"📋 Parsed level {number}: {level_id}")
+            log.debug("📋 Parsed level {}: {}", number, level_id)
             return level
             
         except Exception as e:
@@ -139,22 +217,15 @@ class LevelCollection:
         if not lines:
             return lines
             
-        # Convert HTML entities
-        normalized = []
-        for line in lines:
-            # Replace HTML entities
-            line = line.replace("&amp;", "&")
-            line = line.replace("&lt;", "<")
-            line = line.replace("&gt;", ">")
-            normalized.append(line)
-            
-        return normalized
+        # Convert HTML entities; rows without '&' (nearly all of them) are kept as is
+        return [
+            _ENTITY_RE.sub(lambda m: _ENTITY_CHARS[m.group(1)], line) if "&" in line else line
+            for line in lines
+        ]
         
     def get_level(self, level_number: int) -> Optional[SokobanLevel]:
         """Get a level by its number (1-based)"""
-        if 1 <= level_number <= len(self.levels):
-            return self.levels[level_number - 1]
-        return None
+        return self._by_number.get(level_number)
         
     def get_level_count(self) -> int:
         """Get the total number of levels"""
@@ -174,27 +245,73 @@ class LevelCollection:
         return f"Level {level_number}: Not found"
 
 
-# Global level collection instance
+# Global level collection instance, loaded on first use
 _level_collection = LevelCollection()
+_load_attempted = False
+
+# Parsed collections by (resolved path, mtime), so reloading an unchanged file skips the parse
+_collection_cache: Dict[Tuple[str, int], LevelCollection] = {}
+_COLLECTION_CACHE_SIZE = 8
 
 
 @log_function_call("INFO")
 def load_level_collection(file_path: Optional[str] = None) -> bool:
     """Load the global level collection from file"""
+    global _level_collection
     if file_path is None:
         # Default to the Cosmonotes.slc file
         file_path = str(Path(__file__).parent.parent.parent / "assets" / "levels" / "Cosmonotes.slc")
-        
-    return _level_collection.load_from_slc(file_path)
+    
+    try:
+        cache_key = (str(Path(file_path).resolve()), os.stat(file_path).st_mtime_ns)
+    except OSError:
+        cache_key = None  # Missing file: let load_from_slc report it
+    
+    cached = _collection_cache.get(cache_key)
+    if cached is not None:
+        log.info(f"📁 Reusing parsed levels from: {Path(file_path).name}")
+        _level_collection = cached
+        return True
+    
+    collection = LevelCollection()
+    if not collection.load_from_slc(file_path):
+        return False
+    
+    if cache_key is not None:
+        if len(_collection_cache) >= _COLLECTION_CACHE_SIZE:
+            # Evict the oldest entry
+            del _collection_cache[next(iter(_collection_cache))]
+        _collection_cache[cache_key] = collection
+    _level_collection = collection
+    return True
+
+
+def _ensure_loaded() -> bool:
+    """
+    Load the default collection the first time a level is needed, so importing
+    this module does no file IO. A failed load is not retried on every call.
+    Returns whether any levels are available.
+    """
+    global _load_attempted
+    if not _load_attempted and _level_collection.get_level_count() == 0:
+        _load_attempted = True
+        try:
+            if load_level_collection():
+                log.info(f"🎮 Initialized with {_level_collection.get_level_count()} levels from {_level_collection.title}")
+        except Exception as e:
+            log.warning(f"⚠️ Could not initialize level collection: {e}")
+    return _level_collection.get_level_count() > 0
 
 
 def get_level_collection() -> LevelCollection:
     """Get the global level collection"""
+    _ensure_loaded()
     return _level_collection
 
 
 def get_level(level_number: int) -> Optional[List[str]]:
     """Get level data by number (1-based)"""
+    _ensure_loaded()
     level = _level_collection.get_level(level_number)
     if level:
         return level.get_level_data()
@@ -203,16 +320,19 @@ def get_level(level_number: int) -> Optional[List[str]]:
 
 def get_level_count() -> int:
     """Get total number of available levels"""
+    _ensure_loaded()
     return _level_collection.get_level_count()
 
 
 def get_level_info(level_number: int) -> str:
     """Get information about a specific level"""
+    _ensure_loaded()
     return _level_collection.get_level_info(level_number)
 
 
 def list_available_levels(page: int = 1, per_page: int = 10) -> List[str]:
     """List available levels with their information"""
+    _ensure_loaded()
     levels = _level_collection.list_levels(page, per_page)
     return [str(level) for level in levels]
 
@@ -224,10 +344,8 @@ class Level:
         """Initialize with a specific level number"""
         self.level_number = level_number
         
-        # Ensure collection is loaded
-        if _level_collection.get_level_count() == 0:
-            if not load_level_collection():
-                log.error("❌ Failed to load level collection")
+        if not _ensure_loaded():
+            log.error("❌ Failed to load level collection")
                 
     def generate_level(self) -> List[str]:
         """Get the specified level (renamed for compatibility)"""
@@ -241,14 +359,7 @@ class Level:
             
     def _get_fallback_level(self) -> List[str]:
         """Provide a simple fallback level if requested level is not found"""
-        return [
-            "########",
-            "#      #",
-            "#  $   #",
-            "#   . @#",
-            "#      #",
-            "########"
-        ]
+        return list(_FALLBACK_LEVEL)
 
 
 @log_performance
@@ -266,39 +377,17 @@ def generate_sokoban_level(width: int = 10, height: int = 10,
     Returns:
         List of strings representing the level
     """
-    log.info(f"🎮 Requesting level {level_number}")
+    log.info("🎮 Requesting level {}", level_number)
     
-    # Ensure collection is loaded
-    if _level_collection.get_level_count() == 0:
-        if not load_level_collection():
-            log.error("❌ Failed to load level collection, using fallback")
-            return Level()._get_fallback_level()
+    if not _ensure_loaded():
+        log.error("❌ Failed to load level collection, using fallback")
+        return list(_FALLBACK_LEVEL)
     
-    # Get the requested level
-    level_data = get_level(level_number)
-    if level_data:
-        log.info(f"✅ Loaded level {level_number}: {get_level_info(level_number)}")
-        return level_data
+    # One lookup for the requested level; a loaded collection always has level 1
+    level = _level_collection.get_level(level_number)
+    if level is not None:
+        log.info("✅ Loaded level {}: {}", level_number, level)
     else:
-        log.warning(f"⚠️ Level {level_number} not found, using level 1")
-        level_data = get_level(1)
-        if level_data:
-            return level_data
-        else:
-            log.error("❌ No levels available, using fallback")
-            return Level()._get_fallback_level()
-
-
-# Initialize the level collection on module import
-def _initialize_collection():
-    """Initialize the level collection when module is imported"""
-    try:
-        load_level_collection()
-        if _level_collection.get_level_count() > 0:
-            log.info(f"🎮 Initialized with {_level_collection.get_level_count()} levels from {_level_collection.title}")
-    except Exception as e:
-        log.warning(f"⚠️ Could not initialize level collection: {e}")
-
-
-# Auto-initialize when module is imported
-_initialize_collection()
+        log.warning("⚠️ Level {} not found, using level 1", level_number)
+        level = _level_collection.get_level(1)
+    return level.get_level_data()
@@ -8,6 +8,7 @@ Features beautiful console output and structured file logging for the Sokoban ga
 from pathlib import Path
 from loguru import logger
 import functools
+import time
 from typing import Callable, Any
 
 # Setup log directory
@@ -126,24 +127,25 @@ def log_function_call(log_level: str = "DEBUG"):
             return f"Moved {direction}"
     """
     def decorator(func: Callable) -> Callable:
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            func_logger = get_logger(func.__module__)
-            
-            # Log function entry
+        # Resolved once per decorated function rather than on every call
+        func_logger = get_logger(func.__module__)
+        log_call = getattr(func_logger.opt(lazy=True), log_level.lower())
+        log_done = getattr(func_logger, log_level.lower())
+        name = func.__name__
+        
+        def format_params(args, kwargs) -> str:
             args_str = ", ".join(map(str, args[1:]))  # Skip 'self' parameter
             kwargs_str = ", ".join(f"{k}={v}" for k, v in kwargs.items())
-            params = ", ".join(filter(None, [args_str, kwargs_str]))
-            
-            getattr(func_logger, log_level.lower())(
-                f"🚀 Calling {func.__name__}({params})"
-            )
+            return ", ".join(filter(None, [args_str, kwargs_str]))
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Log function entry; parameters are only formatted if a handler takes the record
+            log_call("🚀 Calling {}({})", lambda: name, lambda: format_params(args, kwargs))
             
             try:
                 result = func(*args, **kwargs)
-                getattr(func_logger, log_level.lower())(
-                    f"✅ {func.__name__} completed successfully"
-                )
+                log_done("✅ {} completed successfully", name)
                 return result
             except Exception as e:
                 func_logger.error(
@@ -165,27 +167,22 @@ def log_performance(func: Callable) -> Callable:
             # Heavy computation
             pass
     """
+    func_logger = get_logger(func.__module__)
+    perf_counter = time.perf_counter
+    name = func.__name__
+    
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        import time
-        func_logger = get_logger(func.__module__)
-        
-        start_time = time.perf_counter()
+        start_time = perf_counter()
         try:
             result = func(*args, **kwargs)
-            end_time = time.perf_counter()
-            execution_time = (end_time - start_time) * 1000  # Convert to milliseconds
+            execution_time = (perf_counter() - start_time) * 1000  # Convert to milliseconds
             
-            func_logger.debug(
-                f"⏱️  {func.__name__} executed in {execution_time:.2f}ms"
-            )
+            func_logger.debug("⏱️  {} executed in {:.2f}ms", name, execution_time)
             return result
         except Exception as e:
-            end_time = time.perf_counter()
-            execution_time = (end_time - start_time) * 1000
-            func_logger.error(
-                f"💥 {func.__name__} failed after {execution_time:.2f}ms: {e}"
-            )
+            execution_time = (perf_counter() - start_time) * 1000
+            func_logger.error("💥 {} failed after {:.2f}ms: {}", name, execution_time, e)
             raise
             
     return wrapper
@@ -252,10 +249,10 @@ def catch_and_log(
         default_return: Value to return if exception is caught and not re-raised
     """
     def decorator(func: Callable) -> Callable:
+        func_logger = get_logger(func.__module__)
+        
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            func_logger = get_logger(func.__module__)
-            
             try:
                 return func(*args, **kwargs)
             except Exception as e:
@@ -42,8 +42,8 @@ def test_bot_integration():
     else:
         print("❌ Auto-solve failed")
     
-    # Test individual algorithms
-    algorithms = ['bfs', 'astar', 'sa']
+    # Test individual algorithms (every one the bot registers; there is no 'sa' solver)
+    algorithms = list(bot.get_algorithm_info())
     
     for alg in algorithms:
         print(f"\n🔄 Testing {alg.upper()}...")
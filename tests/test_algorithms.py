@@ -31,8 +31,8 @@ def test_simple_puzzle():
     game_map = GameMap(simple_level)
     bot = SokobanBot()
     
-    # Test each algorithm
-    algorithms = ['bfs', 'astar', 'sa']
+    # Test each algorithm the bot registers (there is no 'sa' solver)
+    algorithms = list(bot.get_algorithm_info())
     results = {}
     
     for algo in algorithms:
@@ -124,8 +124,8 @@ def compare_all_algorithms():
     game_map = GameMap(test_level)
     bot = SokobanBot()
     
-    # Compare all algorithms
-    results = bot.compare_algorithms(game_map)
+    # Compare all algorithms, each solver in its own process
+    results = bot.compare_algorithms(game_map, workers=len(bot.get_algorithm_info()))
     
     return results
 
@@ -0,0 +1,146 @@
+"""Replay solver output on a fresh map and check it solves the level optimally"""
+import itertools
+import random
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.game_manager import GameMap
+from src.algorithms import breadth_first_search
+from src.algorithms.breadth_first_search import solve_with_bfs
+from src.algorithms.astar_search import AStarSearch, solve_with_astar, _min_cost_matching
+from src.levels.level import LevelCollection
+
+LEVELS_DIR = Path(__file__).parent.parent / 'assets' / 'levels'
+
+# Level 2 of the built-in set; optimal solution is 70 moves
+level_2 = [
+    '########',
+    '#  #   #',
+    '#   $  #',
+    '#  #$$ #',
+    '## #   #',
+    '#.. $# #',
+    '#..   @#',
+    '########'
+]
+
+# One-wide corridor: every push after the first runs through the tunnel macro
+tunnel_level = [
+    '#########',
+    '#@$    .#',
+    '#########'
+]
+
+# Two boxes next to their docks: BFS solves it in 7 moves
+small_level = [
+    '######',
+    '#    #',
+    '# $$ #',
+    '# ..@#',
+    '#    #',
+    '######'
+]
+
+
+def load_ac_easy_1():
+    """AC_Easy #1; optimal solution is 109 moves"""
+    collection = LevelCollection()
+    assert collection.load_from_slc(str(LEVELS_DIR / 'AC_Easy.slc'))
+    return collection.get_level(1).get_level_data()
+
+
+def replay_solves(level_data, moves):
+    """Play moves on a fresh GameMap and report whether the level ends solved"""
+    game_map = GameMap(level_data)
+    for move in moves:
+        assert game_map.move_player(move), f"illegal move {move}"
+    return game_map.is_level_complete()
+
+
+def test_ida_star_fallback_is_optimal(monkeypatch):
+    """A tiny frontier limit forces the IDA* fallback; it must match plain BFS"""
+    expected = solve_with_bfs(GameMap(small_level), max_iterations=100000, time_limit=30)['moves']
+    assert expected is not None
+    
+    monkeypatch.setattr(breadth_first_search, 'MEMORY_FRONTIER_LIMIT', 3)
+    moves = solve_with_bfs(GameMap(small_level), max_iterations=100000, time_limit=30)['moves']
+    assert moves is not None
+    assert len(moves) == len(expected) == 7
+    assert replay_solves(small_level, moves)
+
+
+def test_bfs_level_2_optimal():
+    moves = solve_with_bfs(GameMap(level_2), max_iterations=1000000, time_limit=120)['moves']
+    assert moves is not None and len(moves) == 70
+    assert replay_solves(level_2, moves)
+
+
+def test_bfs_ac_easy_1_optimal():
+    level_data = load_ac_easy_1()
+    moves = solve_with_bfs(GameMap(level_data), max_iterations=1000000, time_limit=120)['moves']
+    assert moves is not None and len(moves) == 109
+    assert replay_solves(level_data, moves)
+
+
+def test_bidirectional_bfs_optimal():
+    for level_data, optimal in ((level_2, 70), (load_ac_easy_1(), 109)):
+        moves = solve_with_bfs(GameMap(level_data), max_iterations=1000000, time_limit=120,
+                               bidirectional=True)['moves']
+        assert moves is not None and len(moves) == optimal
+        assert replay_solves(level_data, moves)
+
+
+def test_astar_level_2_optimal():
+    """A* expands by moving and restoring one shared map, so replay checks restore_state too"""
+    moves = solve_with_astar(GameMap(level_2), max_iterations=1000000, time_limit=120)['moves']
+    assert moves is not None and len(moves) == 70
+    assert replay_solves(level_2, moves)
+
+
+def test_astar_tunnel_macro():
+    assert any(AStarSearch(GameMap(tunnel_level))._tunnel_entries)
+    moves = solve_with_astar(GameMap(tunnel_level), max_iterations=1000, time_limit=30)['moves']
+    assert moves == ['right'] * 5
+    assert replay_solves(tunnel_level, moves)
+
+
+def test_restore_state_round_trip():
+    game_map = GameMap(level_2)
+    player = game_map.player.position.to_tuple()
+    boxes = AStarSearch(game_map).get_box_positions(game_map)
+    for move in ('left', 'left', 'up', 'up', 'left'):
+        game_map.move_player(move)
+    assert AStarSearch(game_map).get_box_positions(game_map) != boxes
+    
+    game_map.restore_state(player, boxes)
+    assert game_map.player.position.to_tuple() == player
+    assert AStarSearch(game_map).get_box_positions(game_map) == boxes
+    moves = solve_with_bfs(GameMap(level_2), max_iterations=1000000, time_limit=120)['moves']
+    for move in moves:
+        assert game_map.move_player(move)
+    assert game_map.is_level_complete()
+
+
+def test_min_cost_matching_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(200):
+        rows = rng.randint(1, 5)
+        columns = rng.randint(rows, 6)
+        cost_rows = [[rng.randint(0, 20) for _ in range(columns)] for _ in range(rows)]
+        best = min(sum(cost_rows[row][column] for row, column in enumerate(assignment))
+                   for assignment in itertools.permutations(range(columns), rows))
+        assert _min_cost_matching(cost_rows) == best
+
+
+def test_heuristic_never_exceeds_remaining_cost():
+    """Along an optimal solution the matching heuristic stays at or below the moves left"""
+    for level_data in (level_2, load_ac_easy_1()):
+        moves = solve_with_bfs(GameMap(level_data), max_iterations=1000000, time_limit=120)['moves']
+        game_map = GameMap(level_data)
+        search = AStarSearch(GameMap(level_data))
+        for done, move in enumerate(moves):
+            remaining = len(moves) - done
+            assert search.calculate_heuristic(search.get_box_positions(game_map)) <= remaining
+            game_map.move_player(move)
+        assert search.calculate_heuristic(search.get_box_positions(game_map)) == 0